@@ -4,21 +4,27 @@ Monitors items, finds matches, sends real email notifications.
 """
 
 import asyncio
+import functools
+import logging
 import sys
 import os
-from datetime import datetime
-from typing import List, Dict
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Dict, Tuple, Optional
 import uuid
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from database import db
-from ai.engine import get_ai_engine
+from ai.engine import get_ai_engine, MATCH_THRESHOLD, NOTIFY_THRESHOLD
 from notifications import notify_match
 
+log = logging.getLogger("findora.agent")
+
 # ================= CONFIG =================
-MATCH_THRESHOLD      = 0.60   # store in DB
-NOTIFY_THRESHOLD     = 0.80   # send email
+MAX_CONCURRENT_ITEMS = 4      # items matched concurrently per cycle
+CPU_WORKERS          = 2      # threads for model inference / scoring
 # ==========================================
 
 
@@ -29,188 +35,268 @@ class FindoraAgent:
         self.match_threshold = match_threshold
         self.check_interval  = check_interval
         self.is_running      = False
-
-        print("=" * 60)
-        print("🤖 FINDORA AUTONOMOUS AI AGENT")
-        print("=" * 60)
-        print(f"   Match Threshold  : {match_threshold} (store in DB)")
-        print(f"   Notify Threshold : {NOTIFY_THRESHOLD} (send email)")
-        print(f"   Check Interval   : {check_interval}s")
-        print("=" * 60)
+        # (item_type, status) → candidate index; lives for one run_cycle
+        self._candidate_cache: Dict[Tuple[str, str], Dict] = {}
+        self._sem   = asyncio.Semaphore(MAX_CONCURRENT_ITEMS)
+        self._cpu   = ThreadPoolExecutor(max_workers=CPU_WORKERS)
+        # Per-cycle queue of (match, lost, found); drained by a single writer
+        self._writes: Optional[asyncio.Queue] = None
+        self._cycle_stats = {"stored": 0, "notified": 0}
+
+        log.info(
+            "🤖 FINDORA AUTONOMOUS AI AGENT — match ≥ %s (store), notify ≥ %s (email), every %ss",
+            match_threshold, NOTIFY_THRESHOLD, check_interval,
+        )
 
     async def observe_new_items(self) -> List[Dict]:
         try:
             return db.get_items_without_features(limit=50)
         except Exception as e:
-            print(f"Error observing items: {e}")
+            log.error("Error observing items: %s", e)
             return []
 
-    async def extract_features(self, item: Dict) -> bool:
+    async def extract_features_batch(self, items: List[Dict]) -> int:
+        """Extract and store features for all items with one batched inference per modality."""
         try:
-            item_id = item["item_id"]
-            print(f"🔍 Extracting features: {item['title']} ({item_id[:8]}...)")
-
-            image_features = None
-            if item.get("image_path"):
-                img = self.ai_engine.extract_image_features(item["image_path"])
-                if img is not None:
-                    image_features = img.tolist()
-
-            text_embedding = None
-            text = f"{item.get('title','')} {item.get('description','')}"
-            if text.strip():
-                emb = self.ai_engine.extract_text_embedding(text)
-                if emb is not None:
-                    text_embedding = emb.tolist()
-
-            if image_features and text_embedding:
-                if db.update_item_features(item_id, image_features, text_embedding):
-                    print("   ✅ Features extracted successfully")
-                    return True
-
-            print("   ⚠️  Feature extraction incomplete")
-            return False
+            pending = [
+                i for i in items
+                if i.get("image_features") is None or i.get("text_embedding") is None
+            ]
+            if not pending:
+                return 0
+
+            log.debug("🔍 Extracting features for %d item(s)...", len(pending))
+
+            # Rows reusing a known image (same digest) already carry image features
+            need_image = [i for i in pending if i.get("image_features") is None]
+
+            # Vision and text inference run side by side on the CPU pool
+            loop = asyncio.get_running_loop()
+            new_feats, text_embs = await asyncio.gather(
+                loop.run_in_executor(
+                    self._cpu, self.ai_engine.extract_image_features_batch,
+                    [i.get("image_path") for i in need_image],
+                ),
+                loop.run_in_executor(
+                    self._cpu, self.ai_engine.extract_text_embeddings_batch,
+                    [f"{i.get('title','')} {i.get('description','')}" for i in pending],
+                ),
+            )
+
+            by_id       = {i["item_id"]: f for i, f in zip(need_image, new_feats)}
+            image_feats = [by_id.get(i["item_id"], i.get("image_features")) for i in pending]
+
+            stored = 0
+            for item, image_features, text_embedding in zip(pending, image_feats, text_embs):
+                if image_features is None or text_embedding is None:
+                    log.warning("⚠️  Feature extraction incomplete: %s (%s...)", item["title"], item["item_id"][:8])
+                    continue
+                if db.update_item_features(item["item_id"], image_features, text_embedding):
+                    stored += 1
+
+            log.debug("✅ Features extracted for %d/%d item(s)", stored, len(pending))
+            return stored
 
         except Exception as e:
-            print(f"Error extracting features: {e}")
-            return False
+            log.error("Error extracting features: %s", e)
+            return 0
+
+    def _load_candidates(self, item_type: str, status: str = "active") -> Dict:
+        """
+        Candidate pool for (item_type, status): one query, one decode of the
+        feature blobs and created_at parse, feature matrices built once. Reused
+        by every query item in the current cycle.
+        """
+        key = (item_type, status)
+        if key not in self._candidate_cache:
+            candidates = db.get_match_candidates(item_type, status=status, limit=100)
+            self._candidate_cache[key] = self.ai_engine.build_candidate_index(candidates)
+        return self._candidate_cache[key]
 
     async def find_matches(self, item: Dict) -> List[Dict]:
         try:
             opposite_type = "found" if item["item_type"] == "lost" else "lost"
-            candidates = db.get_all_items(
-                item_type=opposite_type, status="active", limit=100
-            )
-            candidates = [
-                c for c in candidates
-                if c.get("image_features") and c.get("text_embedding")
-            ]
+            index = self._load_candidates(opposite_type)
 
-            if not candidates:
+            if not index["items"]:
                 return []
 
-            print(f"🔎 Comparing against {len(candidates)} {opposite_type} item(s)...")
+            log.debug("🔎 Comparing against %d %s item(s)...", len(index["items"]), opposite_type)
 
-            return self.ai_engine.batch_match(
+            loop    = asyncio.get_running_loop()
+            matches = await loop.run_in_executor(self._cpu, functools.partial(
+                self.ai_engine.batch_match,
                 query_item=item,
-                candidate_items=candidates,
+                index=index,
                 threshold=self.match_threshold,
                 top_k=5,
-            )
+            ))
+            # Candidates carry only scoring columns — load full rows for the winners
+            for match in matches:
+                match["item"] = db.get_item(match["item"]["item_id"]) or match["item"]
+            return [m for m in matches if "title" in m["item"]]
 
         except Exception as e:
-            print(f"Error finding matches: {e}")
+            log.error("Error finding matches: %s", e)
             return []
 
-    async def store_match(self, lost_id: str, found_id: str, scores: Dict):
-        try:
-            match_id = str(uuid.uuid4())
-            now      = datetime.utcnow().isoformat()
-            db.insert_match({
-                "match_id":         match_id,
-                "lost_item_id":     lost_id,
-                "found_item_id":    found_id,
-                "confidence_score": scores["confidence_score"],
-                "image_similarity": scores["image_similarity"],
-                "text_similarity":  scores["text_similarity"],
-                "location_score":   scores["location_score"],
-                "status":           "pending",
-                "created_at":       now,
-                "updated_at":       now,
-            })
-            print(f"   💾 Match stored: {match_id[:8]}...")
-        except Exception as e:
-            print(f"Error storing match: {e}")
+    async def store_matches(self, pending: List[Tuple[Dict, Dict, Dict]]):
+        """
+        Write a batch of matches in one transaction, then notify for the
+        pairs that were actually new.
+        """
+        if not pending:
+            return
+        # A lost and a found item new in the same cycle each match the other —
+        # keep one entry per pair so the pair is stored and notified once
+        by_pair = {}
+        for entry in pending:
+            _, lost_item, found_item = entry
+            by_pair.setdefault((lost_item["item_id"], found_item["item_id"]), entry)
+        pending = list(by_pair.values())
 
-    async def process_item(self, item: Dict):
         try:
-            item_id = item["item_id"]
-
-            if not item.get("image_features") or not item.get("text_embedding"):
-                if not await self.extract_features(item):
-                    return
-                item = db.get_item(item_id)
-                if not item:
-                    return
-
-            matches = await self.find_matches(item)
-
-            if not matches:
-                print("   ℹ️  No matches found")
-                return
-
-            print(f"   ✨ Found {len(matches)} match(es)!")
-
-            for match in matches:
-                matched_item = match["item"]
-                confidence   = match["confidence_score"]
-
-                if item["item_type"] == "lost":
-                    lost_item, found_item = item, matched_item
-                else:
-                    lost_item, found_item = matched_item, item
-
-                scores = {
-                    "confidence_score": confidence,
+            now  = datetime.now(timezone.utc).isoformat()
+            rows = []
+            for match, lost_item, found_item in pending:
+                rows.append({
+                    "match_id":         str(uuid.uuid4()),
+                    "lost_item_id":     lost_item["item_id"],
+                    "found_item_id":    found_item["item_id"],
+                    "confidence_score": match["confidence_score"],
                     "image_similarity": match["image_similarity"],
                     "text_similarity":  match["text_similarity"],
                     "location_score":   match["location_score"],
-                }
+                    "status":           "pending",
+                    "created_at":       now,
+                    "updated_at":       now,
+                })
+            inserted = {r["match_id"] for r in db.insert_matches_bulk(rows)}
+            self._cycle_stats["stored"] += len(inserted)
+            log.debug("💾 %d new match(es) stored", len(inserted))
+        except Exception as e:
+            log.error("Error storing matches: %s", e)
+            return
 
-                await self.store_match(
-                    lost_item["item_id"],
-                    found_item["item_id"],
-                    scores
+        for (match, lost_item, found_item), row in zip(pending, rows):
+            if row["match_id"] not in inserted:
+                continue
+            confidence = match["confidence_score"]
+
+            # ── REAL EMAIL NOTIFICATION ──────────────────
+            if confidence >= NOTIFY_THRESHOLD:
+                log.info("🎯 %d%% confidence — sending emails!", round(confidence * 100))
+                self._cycle_stats["notified"] += 1
+                await asyncio.get_running_loop().run_in_executor(
+                    None, notify_match, lost_item, found_item, confidence
                 )
-
-                # ── REAL EMAIL NOTIFICATION ──────────────────
-                if confidence >= NOTIFY_THRESHOLD:
-                    print(f"   🎯 {round(confidence*100)}% confidence — sending emails!")
-                    notify_match(lost_item, found_item, confidence)
-                else:
-                    print(f"   📊 {round(confidence*100)}% — below {round(NOTIFY_THRESHOLD*100)}% notify threshold")
-
-        except Exception as e:
-            print(f"Error processing item: {e}")
+            else:
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(
+                        "📊 %d%% — below %d%% notify threshold",
+                        round(confidence * 100), round(NOTIFY_THRESHOLD * 100),
+                    )
+
+    async def _match_writer(self):
+        """
+        Sole consumer of the cycle's match queue, so only one coroutine ever
+        writes matches. Drains whatever is queued into one bulk insert; a
+        None sentinel ends the cycle.
+        """
+        done = False
+        while not done:
+            batch = [await self._writes.get()]
+            while not self._writes.empty():
+                batch.append(self._writes.get_nowait())
+            done = None in batch
+            await self.store_matches([b for b in batch if b is not None])
+
+    async def process_item(self, item: Dict) -> int:
+        """Match one item and queue (match, lost_item, found_item) for the writer."""
+        async with self._sem:
+            try:
+                item_id = item["item_id"]
+
+                if item.get("image_features") is None or item.get("text_embedding") is None:
+                    item = db.get_item(item_id, include_features=True)
+                    if not item or item.get("image_features") is None or item.get("text_embedding") is None:
+                        return 0
+
+                matches = await self.find_matches(item)
+
+                if not matches:
+                    log.debug("ℹ️  No matches found for %s", item["title"])
+                    return 0
+
+                log.debug("✨ Found %d match(es) for %s!", len(matches), item["title"])
+
+                for match in matches:
+                    matched_item = match["item"]
+                    if item["item_type"] == "lost":
+                        self._writes.put_nowait((match, item, matched_item))
+                    else:
+                        self._writes.put_nowait((match, matched_item, item))
+                return len(matches)
+
+            except Exception as e:
+                log.error("Error processing item: %s", e)
+                return 0
 
     async def run_cycle(self):
-        print("\n" + "=" * 60)
-        print(f"🔄 Agent Cycle — {datetime.now().strftime('%H:%M:%S')}")
-        print("=" * 60)
-
-        items = await self.observe_new_items()
+        started = time.perf_counter()
+        items   = await self.observe_new_items()
 
         if not items:
-            print("   ℹ️  No new items to process")
+            log.debug("ℹ️  No new items to process")
             return
 
-        print(f"   📋 Processing {len(items)} item(s)...")
+        self._cycle_stats = {"stored": 0, "notified": 0}
 
-        for i, item in enumerate(items, 1):
-            print(f"\n   [{i}/{len(items)}] {item['title']}")
-            await self.process_item(item)
+        # Features first, so candidate pools loaded below include this cycle's items
+        extracted = await self.extract_features_batch(items)
 
-        print("\n" + "=" * 60)
-        print("✅ Cycle complete")
-        print("=" * 60)
+        self._writes = asyncio.Queue()
+        writer = asyncio.create_task(self._match_writer())
+        try:
+            for item_type in {"found" if i["item_type"] == "lost" else "lost" for i in items}:
+                self._load_candidates(item_type)
+
+            results = await asyncio.gather(
+                *[self.process_item(item) for item in items], return_exceptions=True
+            )
+            for item, result in zip(items, results):
+                if isinstance(result, Exception):
+                    log.error("Error processing %s...: %s", item["item_id"][:8], result)
+        finally:
+            self._candidate_cache.clear()
+            self._writes.put_nowait(None)
+            await writer
+            self._writes = None
+
+        log.info(
+            "🔄 Cycle complete — %d item(s), %d with new features, %d match(es) stored, "
+            "%d notified in %.2fs",
+            len(items), extracted, self._cycle_stats["stored"],
+            self._cycle_stats["notified"], time.perf_counter() - started,
+        )
 
     async def start(self):
         self.is_running = True
-        print("\n🚀 Agent started!")
-        print(f"   Monitoring every {self.check_interval}s")
-        print("   Press Ctrl+C to stop\n")
+        log.info("🚀 Agent started — monitoring every %ss (Ctrl+C to stop)", self.check_interval)
 
         try:
             while self.is_running:
                 await self.run_cycle()
                 await asyncio.sleep(self.check_interval)
         except KeyboardInterrupt:
-            print("\n🛑 Agent stopped by user")
+            log.info("🛑 Agent stopped by user")
         finally:
             self.is_running = False
+            self._cpu.shutdown(wait=False)
 
 
 async def run_agent():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
     agent = FindoraAgent(match_threshold=MATCH_THRESHOLD, check_interval=30)
     await agent.start()
 
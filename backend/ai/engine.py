@@ -10,10 +10,19 @@ FIXES vs original:
 
 import os
 import json
+import logging
+import math
+import shutil
 import tempfile
+import threading
 import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from typing import List, Dict, Optional
-from datetime import datetime
+from datetime import datetime, timezone
+
+log = logging.getLogger("findora.engine")
 
 
 # =========================================================
@@ -34,6 +43,231 @@ def get_images_dir():
     )
 
 
+# =========================================================
+# NUMBA KERNELS  (fall back to plain Python / NumPy without numba)
+# =========================================================
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+
+@njit(cache=True, fastmath=True)
+def _haversine_score(lat1: float, lon1: float, lat2: float, lon2: float, max_km: float) -> float:
+    """exp(-d / (max_km/3)) for great-circle distance d ≤ max_km, else 0."""
+    R = 6371.0
+    lat1, lon1 = math.radians(lat1), math.radians(lon1)
+    lat2, lon2 = math.radians(lat2), math.radians(lon2)
+    dlat, dlon = lat2 - lat1, lon2 - lon1
+    a    = math.sin(dlat/2)**2 + math.cos(lat1)*math.cos(lat2)*math.sin(dlon/2)**2
+    dist = R * (2 * math.atan2(math.sqrt(a), math.sqrt(1 - a)))
+    return 0.0 if dist > max_km else math.exp(-dist / (max_km / 3))
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _haversine_score_vec(lat1: float, lon1: float, lats: np.ndarray, lons: np.ndarray,
+                         max_km: float, out: np.ndarray) -> None:
+    # Callers pass known coordinates only — fastmath assumes no NaNs
+    for i in prange(lats.shape[0]):
+        out[i] = _haversine_score(lat1, lon1, lats[i], lons[i], max_km)
+
+
+# Fusion weights — module constants, so Numba bakes them into the kernel
+W_IMAGE, W_TEXT, W_LOCATION, W_TIME = 0.40, 0.35, 0.15, 0.10
+MAX_CONFIDENCE = 0.95
+
+# Cut-offs were tuned (at 0.60 / 0.80) on (cos+1)/2 similarities. Raw inner
+# products lower a fused score by (W_IMAGE + W_TEXT)/2 · (1 − c̄), c̄ being the
+# weight-averaged cosine, so an old cut T becomes 2T − 0.75 − R for a pair
+# whose location/time/category terms sum to R. R = 0.225 is the reference
+# pair: same category (+0.10), half location and half time credit.
+MATCH_THRESHOLD  = 0.225   # store the match
+NOTIFY_THRESHOLD = 0.625   # email both parties, mark items matched
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _fuse_kernel(img: np.ndarray, txt: np.ndarray, loc: np.ndarray, time: np.ndarray,
+                 cat_boost: np.ndarray, out: np.ndarray) -> None:
+    for i in prange(img.shape[0]):
+        out[i] = min(max(
+            W_IMAGE * img[i] + W_TEXT * txt[i] + W_LOCATION * loc[i] + W_TIME * time[i] + cat_boost[i],
+            0.0), MAX_CONFIDENCE)
+
+
+def fuse_scores(img: np.ndarray, txt: np.ndarray, loc: np.ndarray, time: np.ndarray,
+                cat_boost: np.ndarray) -> np.ndarray:
+    """Weighted confidence per candidate, clipped to [0, MAX_CONFIDENCE]."""
+    out = np.empty(img.shape[0], dtype=np.float32)
+    if HAVE_NUMBA:
+        _fuse_kernel(img, txt, loc, time, cat_boost, out)
+    else:
+        np.clip(W_IMAGE * img + W_TEXT * txt + W_LOCATION * loc + W_TIME * time + cat_boost,
+                0.0, MAX_CONFIDENCE, out=out)
+    return out
+
+
+# =========================================================
+# BOUNDED LRU MEMO  (in-process feature cache)
+# =========================================================
+class _LRUCache:
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        if key not in self._data:
+            return None
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+# =========================================================
+# SEMANTIC TEXT CACHE  (exact-text LRU → shared near-duplicate centroids)
+# =========================================================
+class _SemanticTextCache:
+    """
+    Maps normalised text to a cluster centroid. A new embedding whose cosine
+    to an existing centroid exceeds `threshold` joins that cluster (EMA
+    update) instead of starting its own, so boilerplate titles converge on
+    one vector. At most `maxsize` texts; clusters are freed with their last text.
+    """
+
+    def __init__(self, maxsize: int = 5000, threshold: float = 0.86, alpha: float = 0.1):
+        self.maxsize   = maxsize
+        self.threshold = threshold
+        self.alpha     = alpha
+        self._texts: OrderedDict = OrderedDict()        # text → slot
+        self._refs     = np.zeros(maxsize, dtype=np.int32)
+        self._mat: Optional[np.ndarray] = None           # (maxsize, d) centroids
+        self._free: List[int] = []
+        self._used     = 0
+        self._lock     = threading.Lock()
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        with self._lock:
+            slot = self._texts.get(text)
+            if slot is None:
+                return None
+            self._texts.move_to_end(text)
+            return self._frozen(slot)
+
+    def add(self, text: str, emb: np.ndarray) -> np.ndarray:
+        """Insert a freshly encoded (unit) embedding; returns the vector to use for text."""
+        with self._lock:
+            if text in self._texts:
+                return self._frozen(self._texts[text])
+            while len(self._texts) >= self.maxsize:
+                self._release(self._texts.popitem(last=False)[1])
+            if self._mat is None:
+                self._mat = np.zeros((self.maxsize, emb.shape[0]), dtype=np.float32)
+
+            slot = self._nearest(emb)
+            if slot is None:
+                slot = self._free.pop() if self._free else self._used
+                self._used = max(self._used, slot + 1)
+                self._mat[slot] = emb
+            else:
+                centroid = (1 - self.alpha) * self._mat[slot] + self.alpha * emb
+                self._mat[slot] = centroid / max(np.linalg.norm(centroid), 1e-12)
+
+            self._refs[slot] += 1
+            self._texts[text] = slot
+            return self._frozen(slot)
+
+    def _nearest(self, emb: np.ndarray) -> Optional[int]:
+        if self._used == 0:
+            return None
+        sims = self._mat[:self._used] @ emb
+        sims[self._refs[:self._used] == 0] = -np.inf
+        best = int(np.argmax(sims))
+        return best if sims[best] > self.threshold else None
+
+    def _release(self, slot: int):
+        self._refs[slot] -= 1
+        if self._refs[slot] == 0:
+            self._free.append(slot)
+
+    def _frozen(self, slot: int) -> np.ndarray:
+        vec = self._mat[slot].copy()
+        vec.setflags(write=False)
+        return vec
+
+
+# =========================================================
+# INT8 ONNX TEXT ENCODER  (SentenceTransformer.encode contract)
+# =========================================================
+TEXT_MODEL_NAME    = "all-MiniLM-L6-v2"
+TEXT_MAX_SEQ_LEN   = 256
+
+
+class _OnnxSentenceEncoder:
+    """all-MiniLM-L6-v2 run through ONNX Runtime: mean pooling + optional L2 norm."""
+
+    def __init__(self, model_path: str, tokenizer):
+        import onnxruntime as ort
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session   = ort.InferenceSession(model_path, opts, providers=["CPUExecutionProvider"])
+        self.tokenizer = tokenizer
+        self._inputs   = [i.name for i in self.session.get_inputs()]
+
+    def encode(self, sentences, batch_size: int = 64, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, **_) -> np.ndarray:
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        out = []
+        for start in range(0, len(sentences), batch_size):
+            enc = self.tokenizer(
+                sentences[start:start + batch_size], padding=True, truncation=True,
+                max_length=TEXT_MAX_SEQ_LEN, return_tensors="np",
+            )
+            mask  = enc["attention_mask"].astype(np.int64)
+            feeds = {
+                name: (enc[name] if name in enc else np.zeros_like(mask)).astype(np.int64)
+                for name in self._inputs
+            }
+            hidden = self.session.run(None, feeds)[0]                 # (B, seq, d)
+            weight = mask[..., None].astype(np.float32)
+            emb    = (hidden * weight).sum(axis=1) / np.clip(weight.sum(axis=1), 1e-9, None)
+            if normalize_embeddings:
+                norms = np.linalg.norm(emb, axis=1, keepdims=True)
+                emb   = emb / np.where(norms > 0, norms, 1.0)
+            out.append(emb.astype(np.float32))
+
+        embs = np.vstack(out) if out else np.zeros((0, 0), dtype=np.float32)
+        return embs[0] if single else embs
+
+
+# Keras batch shapes the compiled vision graph is traced for
+VISION_BUCKETS = (1, 2, 4, 8, 16, 32)
+
+
+# =========================================================
+# CANDIDATE INDEX  (exact BLAS matmul over stored features)
+# =========================================================
+def _normalize_rows(mat: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    mat  /= np.where(norms > 0, norms, 1.0)
+    return mat
+
+
 # =========================================================
 # PRODUCTION AI ENGINE
 # =========================================================
@@ -46,48 +280,149 @@ class ProductionAIEngine:
         self.models_dir = models_dir
         self.images_dir = get_images_dir()
         self.vision_model = None
+        self.vision_interpreter = None   # TFLite INT8 encoder, preferred on CPU
+        self.vision_device = None        # "/GPU:0" when TensorFlow sees a GPU
+        self._vision_forward = None      # tf.function-compiled Keras forward pass
         self.text_model   = None
+        self._image_cache = _LRUCache(maxsize=1024)   # (path, mtime) → vector
+        self._text_cache  = _SemanticTextCache(maxsize=5000, threshold=0.86)
 
-        print("🚀 Initialising Production AI Engine...")
-        print(f"   Models dir : {self.models_dir}")
-        print(f"   Images dir : {self.images_dir}")
+        log.info("🚀 Initialising Production AI Engine...")
+        log.info("Models dir : %s", self.models_dir)
+        log.info("Images dir : %s", self.images_dir)
         self._load_models()
 
     # =====================================================
     # MODEL LOADING
     # =====================================================
     def _load_models(self):
-        keras_path = os.path.join(self.models_dir, "vision_encoder.keras")
-        h5_path    = os.path.join(self.models_dir, "vision_encoder.h5")
+        keras_path  = os.path.join(self.models_dir, "vision_encoder.keras")
+        h5_path     = os.path.join(self.models_dir, "vision_encoder.h5")
+        tflite_path = os.path.join(self.models_dir, "vision_encoder.tflite")
 
-        if os.path.exists(keras_path):
+        try:
+            import tensorflow as tf
+            if tf.config.list_physical_devices("GPU"):
+                self.vision_device = "/GPU:0"
+                log.info("✅ GPU detected → vision encoder on %s", self.vision_device)
+        except Exception as e:
+            log.warning("⚠️  GPU detection failed: %s", e)
+
+        # INT8 TFLite only pays off on CPU; with a GPU keep the Keras model
+        use_tflite = self.vision_device is None
+
+        if use_tflite and os.path.exists(tflite_path) and self._load_tflite_vision(tflite_path):
+            pass
+        elif os.path.exists(keras_path):
             try:
                 from tensorflow.keras.models import load_model
-                self.vision_model = load_model(keras_path, compile=False)
-                print("✅ Vision encoder loaded (.keras)")
+                with self._vision_scope():
+                    self.vision_model = load_model(keras_path, compile=False)
+                log.info("✅ Vision encoder loaded (.keras)")
             except Exception as e:
-                print(f"⚠️  .keras load failed: {e} → rebuilding fallback")
+                log.warning("⚠️  .keras load failed: %s → rebuilding fallback", e)
                 self._init_fallback_vision()
         elif os.path.exists(h5_path):
             try:
                 from tensorflow.keras.models import load_model
-                self.vision_model = load_model(h5_path, compile=False)
-                print("✅ Vision encoder loaded (.h5)")
+                with self._vision_scope():
+                    self.vision_model = load_model(h5_path, compile=False)
+                log.info("✅ Vision encoder loaded (.h5)")
             except Exception as e:
-                print(f"⚠️  .h5 load failed: {e} → rebuilding fallback")
+                log.warning("⚠️  .h5 load failed: %s → rebuilding fallback", e)
                 self._init_fallback_vision()
         else:
-            print("⚠️  No saved vision model → building fallback MobileNetV3")
+            log.warning("⚠️  No saved vision model → building fallback MobileNetV3")
             self._init_fallback_vision()
 
+        if use_tflite and self.vision_interpreter is None and self.vision_model is not None:
+            try:
+                self._convert_tflite_vision(tflite_path)
+                self._load_tflite_vision(tflite_path)
+            except Exception as e:
+                log.warning("⚠️  TFLite conversion failed: %s → using Keras", e)
+
+        if self.vision_interpreter is None and self.vision_model is not None:
+            self._build_vision_forward()
+
         try:
-            from sentence_transformers import SentenceTransformer
-            self.text_model = SentenceTransformer("all-MiniLM-L6-v2")
-            print("✅ Text encoder loaded")
+            self.text_model = self._load_text_model()
         except Exception as e:
-            print(f"❌ Text encoder failed: {e}")
+            log.error("❌ Text encoder failed: %s", e)
             raise
 
+    # =====================================================
+    # TEXT MODEL  (INT8 ONNX, SentenceTransformer fallback)
+    # =====================================================
+    def _load_text_model(self):
+        onnx_path = os.path.join(self.models_dir, "minilm-int8.onnx")
+        tok_dir   = os.path.join(self.models_dir, "minilm-tokenizer")
+        st_model  = None
+
+        try:
+            if not os.path.exists(onnx_path):
+                st_model = self._export_onnx_text_model(onnx_path, tok_dir)
+            from transformers import AutoTokenizer
+            model = _OnnxSentenceEncoder(onnx_path, AutoTokenizer.from_pretrained(tok_dir))
+            log.info("✅ Text encoder loaded (ONNX INT8)")
+            return model
+        except Exception as e:
+            log.warning("⚠️  ONNX text encoder unavailable: %s → SentenceTransformer", e)
+
+        if st_model is None:
+            from sentence_transformers import SentenceTransformer
+            st_model = SentenceTransformer(TEXT_MODEL_NAME)
+        log.info("✅ Text encoder loaded")
+        return st_model
+
+    def _export_onnx_text_model(self, onnx_path: str, tok_dir: str):
+        """
+        One-time export of the SentenceTransformer's transformer to ONNX,
+        then dynamic INT8 weight quantisation. Returns the loaded
+        SentenceTransformer so a failed export can still fall back to it.
+
+        Everything is written to per-process temp names and renamed into
+        place, tokenizer first and model last, so a worker exporting at the
+        same time never loads a half-written file.
+        """
+        import torch
+        from sentence_transformers import SentenceTransformer
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        log.warning("⚠️  No INT8 text model → exporting all-MiniLM-L6-v2 to ONNX")
+        st_model = SentenceTransformer(TEXT_MODEL_NAME)
+        hf_model = st_model[0].auto_model.eval()
+        tokenizer = st_model.tokenizer
+
+        os.makedirs(self.models_dir, exist_ok=True)
+        work_dir  = tempfile.mkdtemp(prefix="minilm-export-", dir=self.models_dir)
+        fp32_path = os.path.join(work_dir, "model-fp32.onnx")
+        int8_path = os.path.join(work_dir, "model-int8.onnx")
+        tmp_tok   = os.path.join(work_dir, "tokenizer")
+        dummy     = tokenizer(["findora lost and found"], return_tensors="pt")
+        names     = ["input_ids", "attention_mask", "token_type_ids"]
+        axes      = {n: {0: "batch", 1: "seq"} for n in names}
+        axes["last_hidden_state"] = {0: "batch", 1: "seq"}
+
+        try:
+            with torch.no_grad():
+                torch.onnx.export(
+                    hf_model, tuple(dummy[n] for n in names), fp32_path,
+                    input_names=names, output_names=["last_hidden_state"],
+                    dynamic_axes=axes, opset_version=14,
+                )
+            quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+            tokenizer.save_pretrained(tmp_tok)
+            try:
+                os.rename(tmp_tok, tok_dir)
+            except OSError:
+                pass   # another worker already put an identical tokenizer in place
+            os.replace(int8_path, onnx_path)
+            log.info("✅ INT8 text model saved → %s", onnx_path)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        return st_model
+
     # =====================================================
     # FALLBACK VISION MODEL  (no Lambda — uses Keras subclass)
     # =====================================================
@@ -101,77 +436,209 @@ class ProductionAIEngine:
             def call(self, x):
                 return tf.math.l2_normalize(x, axis=1)
 
-        base = MobileNetV3Small(include_top=False, weights="imagenet", pooling="avg")
-        out  = L2Norm()(base.output)
-        self.vision_model = Model(base.input, out, name="vision_encoder")
-        print("✅ Fallback MobileNetV3 vision model built")
+        with self._vision_scope():
+            base = MobileNetV3Small(include_top=False, weights="imagenet", pooling="avg")
+            out  = L2Norm()(base.output)
+            self.vision_model = Model(base.input, out, name="vision_encoder")
+        log.info("✅ Fallback MobileNetV3 vision model built")
 
         try:
             os.makedirs(self.models_dir, exist_ok=True)
             save_path = os.path.join(self.models_dir, "vision_encoder.keras")
             self.vision_model.save(save_path)
-            print(f"✅ Vision model saved → {save_path}")
+            log.info("✅ Vision model saved → %s", save_path)
         except Exception as e:
-            print(f"⚠️  Could not save vision model: {e}")
+            log.warning("⚠️  Could not save vision model: %s", e)
 
     # =====================================================
-    # IMAGE FEATURES  — supports local paths AND https:// URLs
+    # TFLITE VISION MODEL  (post-training INT8, XNNPACK on CPU)
     # =====================================================
-    def extract_image_features(self, image_path: str) -> Optional[np.ndarray]:
+    def _representative_images(self, limit: int = 50):
+        """Calibration batches for INT8 quantisation: stored images, else noise."""
+        yielded = 0
+        if os.path.isdir(self.images_dir):
+            for name in sorted(os.listdir(self.images_dir)):
+                if yielded >= limit:
+                    break
+                if name.lower().endswith(".avif"):
+                    continue
+                arr = self._load_image((os.path.join(self.images_dir, name), 0))
+                if arr is not None:
+                    yielded += 1
+                    yield [arr[None].astype(np.float32)]
+        rng = np.random.default_rng(0)
+        while yielded < 10:
+            yielded += 1
+            yield [rng.integers(0, 256, (1, 224, 224, 3)).astype(np.float32)]
+
+    def _convert_tflite_vision(self, tflite_path: str):
+        import tensorflow as tf
+
+        converter = tf.lite.TFLiteConverter.from_keras_model(self.vision_model)
+        converter.optimizations          = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = self._representative_images
+        tflite_model = converter.convert()
+
+        os.makedirs(self.models_dir, exist_ok=True)
+        with open(tflite_path, "wb") as f:
+            f.write(tflite_model)
+        log.info("✅ INT8 TFLite vision model saved → %s", tflite_path)
+
+    def _load_tflite_vision(self, tflite_path: str) -> bool:
+        try:
+            import tensorflow as tf
+            self.vision_interpreter = tf.lite.Interpreter(
+                model_path=tflite_path, num_threads=os.cpu_count()
+            )
+            self.vision_interpreter.allocate_tensors()
+            log.info("✅ Vision encoder loaded (TFLite INT8)")
+            return True
+        except Exception as e:
+            self.vision_interpreter = None
+            log.warning("⚠️  TFLite load failed: %s", e)
+            return False
+
+    def _run_tflite(self, batch: np.ndarray, batch_size: int = 32) -> np.ndarray:
+        interp = self.vision_interpreter
+        out    = []
+        for start in range(0, len(batch), batch_size):
+            chunk = batch[start:start + batch_size]
+            inp   = interp.get_input_details()[0]
+            if tuple(inp["shape"]) != chunk.shape:
+                interp.resize_tensor_input(inp["index"], chunk.shape)
+                interp.allocate_tensors()
+            interp.set_tensor(inp["index"], chunk)
+            interp.invoke()
+            out.append(interp.get_tensor(interp.get_output_details()[0]["index"]).copy())
+        return np.concatenate(out, axis=0)
+
+    # =====================================================
+    # KERAS VISION FORWARD  (GPU when available, XLA-compiled)
+    # =====================================================
+    def _vision_scope(self):
+        if self.vision_device is None:
+            return nullcontext()
+        import tensorflow as tf
+        return tf.device(self.vision_device)
+
+    def _build_vision_forward(self):
         """
-        Accepts:
-          - Cloudinary https:// URL  → download to temp file, then extract
-          - Local /storage/images/UUID.ext path
+        XLA-compile the forward pass and trace it once per VISION_BUCKETS
+        shape now, so no live request pays for (or fails in) a compile.
         """
-        if not image_path:
-            return None
+        import tensorflow as tf
+
+        model = self.vision_model
+
+        def forward(x):
+            return model(x, training=False)
 
         try:
-            from PIL import Image
-            from tensorflow.keras.preprocessing import image as keras_image
-            from tensorflow.keras.applications.mobilenet_v3 import preprocess_input
-
-            # ── Cloudinary / any remote URL ───────────────────────────────
-            if image_path.startswith("http://") or image_path.startswith("https://"):
-                return self._extract_from_url(image_path)
-
-            # ── Local file path ───────────────────────────────────────────
-            image_path = image_path.replace("\\", "/").lstrip("/")
-
-            if image_path.startswith("storage/"):
-                if os.path.exists("/data"):
-                    full_path = os.path.join("/data", image_path)
-                else:
-                    backend_dir = os.path.abspath(
-                        os.path.join(os.path.dirname(__file__), "..")
-                    )
-                    full_path = os.path.join(backend_dir, image_path)
+            compiled = tf.function(forward, jit_compile=True)
+            with self._vision_scope():
+                for size in VISION_BUCKETS:
+                    compiled(tf.zeros((size, 224, 224, 3), tf.float32))
+            self._vision_forward = compiled
+            log.info("✅ Vision forward pass XLA-compiled (batch buckets %s)", VISION_BUCKETS)
+        except Exception as e:
+            log.warning("⚠️  XLA compile failed: %s → plain tf.function", e)
+            self._vision_forward = tf.function(forward)
+
+    @staticmethod
+    def _bucket_size(n: int) -> int:
+        """Smallest VISION_BUCKETS entry that fits n images."""
+        for size in VISION_BUCKETS:
+            if size >= n:
+                return size
+        return VISION_BUCKETS[-1]
+
+    def _run_keras(self, batch: np.ndarray, batch_size: int = 32) -> np.ndarray:
+        """Direct model call instead of predict(): no Keras loop overhead.
+
+        Short chunks are zero-padded up to the next power-of-two bucket, so
+        the compiled graph only ever sees the shapes warmed up at load time
+        and a single image costs one forward pass, not batch_size.
+        """
+        import tensorflow as tf
+
+        batch_size = min(batch_size, VISION_BUCKETS[-1])
+        out = []
+        for start in range(0, len(batch), batch_size):
+            chunk = batch[start:start + batch_size]
+            n     = len(chunk)
+            size  = self._bucket_size(n)
+            if n < size:
+                pad   = np.zeros((size - n,) + chunk.shape[1:], dtype=chunk.dtype)
+                chunk = np.concatenate([chunk, pad], axis=0)
+            with self._vision_scope():
+                x = tf.convert_to_tensor(chunk)
+                y = self._vision_forward(x)
+            out.append(y.numpy()[:n])
+        return np.concatenate(out, axis=0)
+
+    # =====================================================
+    # IMAGE FEATURES  — supports local paths AND https:// URLs
+    # =====================================================
+    @staticmethod
+    def _resolve_local_path(image_path: str) -> str:
+        image_path = image_path.replace("\\", "/").lstrip("/")
+
+        if image_path.startswith("storage/"):
+            if os.path.exists("/data"):
+                full_path = os.path.join("/data", image_path)
             else:
-                full_path = image_path
+                backend_dir = os.path.abspath(
+                    os.path.join(os.path.dirname(__file__), "..")
+                )
+                full_path = os.path.join(backend_dir, image_path)
+        else:
+            full_path = image_path
 
-            full_path = os.path.normpath(full_path)
+        return os.path.normpath(full_path)
 
-            if not os.path.exists(full_path):
-                print(f"❌ Image file not found: {full_path}")
-                return None
+    def _image_cache_key(self, image_path: str) -> Optional[tuple]:
+        """(path, mtime) for a local file, (url, None) for a remote image; None if unusable."""
+        if image_path.startswith("http://") or image_path.startswith("https://"):
+            return (image_path, None)
 
-            if full_path.lower().endswith(".avif"):
-                print(f"⚠️  AVIF skipped: {full_path}")
-                return None
+        full_path = self._resolve_local_path(image_path)
+
+        if not os.path.exists(full_path):
+            log.error("❌ Image file not found: %s", full_path)
+            return None
+
+        if full_path.lower().endswith(".avif"):
+            log.warning("⚠️  AVIF skipped: %s", full_path)
+            return None
+
+        return (full_path, os.path.getmtime(full_path))
+
+    @staticmethod
+    def _pil_to_array(img) -> np.ndarray:
+        # uint8 until the whole batch is stacked — one float32 cast per batch
+        return np.asarray(img.convert("RGB").resize((224, 224)), dtype=np.uint8)
 
-            return self._extract_from_pil(Image.open(full_path))
+    def _load_image(self, key: tuple) -> Optional[np.ndarray]:
+        """Decode + resize one image (keyed as in _image_cache_key) to a (224, 224, 3) uint8 array."""
+        path, mtime = key
+        try:
+            from PIL import Image
 
+            if mtime is None:
+                return self._load_from_url(path)
+            with Image.open(path) as img:
+                return self._pil_to_array(img)
         except Exception as e:
-            print(f"❌ Image feature error: {e}")
+            log.error("❌ Image load error: %s", e)
             return None
 
-    def _extract_from_url(self, url: str) -> Optional[np.ndarray]:
-        """Download image from URL to a temp file, then extract features."""
+    def _load_from_url(self, url: str) -> Optional[np.ndarray]:
+        """Download image from URL to a temp file, then decode it."""
         try:
             import requests
             from PIL import Image
 
-            print(f"   📥 Downloading image from URL: {url[:60]}...")
+            log.debug("📥 Downloading image from URL: %s...", url[:60])
             resp = requests.get(url, timeout=15, stream=True)
             resp.raise_for_status()
 
@@ -186,111 +653,208 @@ class ProductionAIEngine:
                     tmp.write(chunk)
 
             try:
-                img     = Image.open(tmp_path)
-                features = self._extract_from_pil(img)
-                return features
+                with Image.open(tmp_path) as img:
+                    return self._pil_to_array(img)
             finally:
                 os.unlink(tmp_path)   # always clean up
 
         except Exception as e:
-            print(f"❌ URL image download error: {e}")
+            log.error("❌ URL image download error: %s", e)
             return None
 
-    def _extract_from_pil(self, img) -> Optional[np.ndarray]:
-        """Run MobileNetV3 on a PIL Image and return the feature vector."""
-        try:
-            from PIL import Image
-            from tensorflow.keras.preprocessing import image as keras_image
-            from tensorflow.keras.applications.mobilenet_v3 import preprocess_input
+    def extract_image_features(self, image_path: str) -> Optional[np.ndarray]:
+        """
+        Accepts:
+          - Cloudinary https:// URL  → download to temp file, then extract
+          - Local /storage/images/UUID.ext path
+        Results are memoised per (path, mtime); URLs are keyed by the URL.
+        """
+        if not image_path:
+            return None
+        return self.extract_image_features_batch([image_path])[0]
+
+    def extract_image_features_batch(self, image_paths: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Feature vectors for many images with a single MobileNetV3 predict.
+        Decoding/downloading runs in a thread pool. The result list is
+        aligned with image_paths (None where an image could not be used).
+        """
+        results: List[Optional[np.ndarray]] = [None] * len(image_paths)
+        pending: Dict[tuple, List[int]] = {}
 
-            img = img.convert("RGB").resize((224, 224))
-            arr = keras_image.img_to_array(img)
-            arr = np.expand_dims(arr, axis=0)
-            arr = preprocess_input(arr)
+        for i, path in enumerate(image_paths):
+            if not path:
+                continue
+            try:
+                key = self._image_cache_key(path)
+            except Exception as e:
+                log.error("❌ Image feature error: %s", e)
+                continue
+            if key is None:
+                continue
+            cached = self._image_cache.get(key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.setdefault(key, []).append(i)
+
+        if not pending:
+            return results
 
-            features = self.vision_model.predict(arr, verbose=0)
-            return features.flatten()
+        keys = list(pending)
+        if len(keys) == 1:
+            arrays = [self._load_image(keys[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(8, len(keys))) as pool:
+                arrays = list(pool.map(self._load_image, keys))
+
+        loaded = [(k, a) for k, a in zip(keys, arrays) if a is not None]
+        if not loaded:
+            return results
+
+        try:
+            # MobileNetV3's preprocess_input is a pass-through: the model has its
+            # own Rescaling layer and expects raw [0, 255] pixels.
+            batch = np.stack([a for _, a in loaded]).astype(np.float32)
+            if self.vision_interpreter is not None:
+                features = self._run_tflite(batch, batch_size=32)
+            else:
+                features = self._run_keras(batch, batch_size=32)
+            features = features.reshape(len(loaded), -1)
+            # Not every saved encoder ends in L2Norm — normalise so cosine is a dot
+            norms    = np.linalg.norm(features, axis=1, keepdims=True)
+            features = features / np.where(norms > 0, norms, 1.0)
         except Exception as e:
-            print(f"❌ PIL feature extraction error: {e}")
-            return None
+            log.error("❌ Batch feature extraction error: %s", e)
+            return results
+
+        for (key, _), feat in zip(loaded, features):
+            feat.setflags(write=False)
+            self._image_cache.put(key, feat)
+            for i in pending[key]:
+                results[i] = feat
+        return results
 
     # =====================================================
     # TEXT EMBEDDINGS
     # =====================================================
     def extract_text_embedding(self, text: str) -> Optional[np.ndarray]:
+        return self.extract_text_embeddings_batch([text])[0]
+
+    def extract_text_embeddings_batch(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """L2-normalised embeddings for many texts with one encode call, aligned with texts."""
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}
+
+        for i, text in enumerate(texts):
+            text   = " ".join(text.lower().split())
+            cached = self._text_cache.get(text)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.setdefault(text, []).append(i)
+
+        if not pending:
+            return results
+
         try:
-            text = " ".join(text.lower().split())
-            emb  = self.text_model.encode(text, convert_to_numpy=True)
-            norm = np.linalg.norm(emb)
-            return emb / norm if norm > 0 else emb
+            keys = list(pending)
+            embs = self.text_model.encode(
+                keys, batch_size=64, convert_to_numpy=True, normalize_embeddings=True,
+            )
         except Exception as e:
-            print(f"❌ Text embedding error: {e}")
-            return None
+            log.error("❌ Text embedding error: %s", e)
+            return results
+
+        for key, emb in zip(keys, embs):
+            emb = self._text_cache.add(key, np.asarray(emb, dtype=np.float32))
+            for i in pending[key]:
+                results[i] = emb
+        return results
 
     # =====================================================
     # SCORING UTILITIES
     # =====================================================
     def cosine(self, a: np.ndarray, b: np.ndarray) -> float:
-        from sklearn.metrics.pairwise import cosine_similarity
-        return float(
-            (cosine_similarity(a.reshape(1, -1), b.reshape(1, -1))[0][0] + 1) / 2
-        )
+        """Inner product of unit vectors (every stored feature is L2-normalised)."""
+        return float(a @ b)
 
     def location_score(self, lat1, lon1, lat2, lon2, max_km: float = 10) -> float:
         if not all([lat1, lon1, lat2, lon2]):
             return 0.5
-        from math import radians, sin, cos, sqrt, atan2
+        return float(_haversine_score(float(lat1), float(lon1), float(lat2), float(lon2), float(max_km)))
+
+    def location_score_vec(self, lat1, lon1, lats: np.ndarray, lons: np.ndarray,
+                           max_km: float = 10) -> np.ndarray:
+        """location_score against arrays of candidates (NaN = unknown coordinate)."""
+        out = np.full(lats.shape, 0.5, dtype=np.float32)
+        if not lat1 or not lon1:
+            return out
+        known = ~(np.isnan(lats) | np.isnan(lons))
+        if not known.any():
+            return out
+        if HAVE_NUMBA:
+            scores = np.empty(int(known.sum()), dtype=np.float64)
+            _haversine_score_vec(float(lat1), float(lon1), lats[known], lons[known],
+                                 float(max_km), scores)
+            out[known] = scores
+            return out
         R = 6371
-        lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+        lat1, lon1 = np.radians(lat1), np.radians(lon1)
+        lat2, lon2 = np.radians(lats[known]), np.radians(lons[known])
         dlat, dlon = lat2 - lat1, lon2 - lon1
-        a    = sin(dlat/2)**2 + cos(lat1)*cos(lat2)*sin(dlon/2)**2
-        dist = R * (2 * atan2(sqrt(a), sqrt(1 - a)))
-        return 0.0 if dist > max_km else float(np.exp(-dist / (max_km / 3)))
+        a    = np.sin(dlat/2)**2 + np.cos(lat1)*np.cos(lat2)*np.sin(dlon/2)**2
+        dist = R * (2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a)))
+        out[known] = np.where(dist > max_km, 0.0, np.exp(-dist / (max_km / 3)))
+        return out
+
+    @staticmethod
+    def _item_epoch(item: Dict) -> float:
+        """created_at_ts (epoch seconds) for an item; parses created_at only for legacy rows."""
+        ts = item.get("created_at_ts")
+        if ts is not None:
+            return float(ts)
+        created_at = item.get("created_at")
+        if not created_at:
+            return np.nan
+        try:
+            dt = datetime.fromisoformat(created_at)
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)   # stored timestamps are UTC
+            return dt.timestamp()
+        except Exception:
+            return np.nan
+
+    def temporal_score_vec(self, ts: float, stamps: np.ndarray) -> np.ndarray:
+        """exp(-|Δt| / 30 days) against an array of candidate epoch seconds (NaN = unknown)."""
+        out = np.full(stamps.shape, 0.7, dtype=np.float32)
+        if np.isnan(ts):
+            return out
+        known = ~np.isnan(stamps)
+        out[known] = np.exp(-np.abs(stamps[known] - ts) / (30 * 86400))
+        return out
+
+    def temporal_score(self, ts1: float, ts2: float) -> float:
+        if np.isnan(ts1) or np.isnan(ts2):
+            return 0.7
+        return float(np.exp(-abs(ts1 - ts2) / (30 * 86400)))
 
     # =====================================================
     # SMART MATCH (single pair)
     # =====================================================
-    def match_items(self, item1: Dict, item2: Dict, threshold: float = 0.6) -> Dict:
+    def match_items(self, item1: Dict, item2: Dict, threshold: float = MATCH_THRESHOLD) -> Dict:
         image_sim = 0.0
         text_sim  = 0.0
 
-        # Vision similarity
-        f1 = None
-        f2 = None
-        if item1.get("image_features"):
-            f1 = np.array(item1["image_features"])
-        elif item1.get("image_path"):
-            raw = self.extract_image_features(item1["image_path"])
-            if raw is not None:
-                f1 = raw
-
-        if item2.get("image_features"):
-            f2 = np.array(item2["image_features"])
-        elif item2.get("image_path"):
-            raw = self.extract_image_features(item2["image_path"])
-            if raw is not None:
-                f2 = raw
-
+        f1 = self._features_from_dict(item1, "image_features")
+        f2 = self._features_from_dict(item2, "image_features")
         if f1 is not None and f2 is not None:
-            image_sim = self.cosine(f1, f2)
-
-        # Text similarity
-        e1 = None
-        e2 = None
-        if item1.get("text_embedding"):
-            e1 = np.array(item1["text_embedding"])
-        else:
-            t1 = f"{item1.get('title','')} {item1.get('description','')}"
-            e1 = self.extract_text_embedding(t1)
-
-        if item2.get("text_embedding"):
-            e2 = np.array(item2["text_embedding"])
-        else:
-            t2 = f"{item2.get('title','')} {item2.get('description','')}"
-            e2 = self.extract_text_embedding(t2)
+            image_sim = max(0.0, self.cosine(f1, f2))
 
+        e1 = self._features_from_dict(item1, "text_embedding")
+        e2 = self._features_from_dict(item2, "text_embedding")
         if e1 is not None and e2 is not None:
-            text_sim = self.cosine(e1, e2)
+            text_sim = max(0.0, self.cosine(e1, e2))
 
         cat_boost = 0.10 if item1.get("category") == item2.get("category") else -0.05
 
@@ -299,25 +863,16 @@ class ProductionAIEngine:
             item2.get("latitude"),  item2.get("longitude"),
         )
 
-        time_score = 0.7
-        if item1.get("created_at") and item2.get("created_at"):
-            try:
-                days = abs(
-                    (datetime.fromisoformat(item1["created_at"]) -
-                     datetime.fromisoformat(item2["created_at"])).days
-                )
-                time_score = float(np.exp(-days / 30))
-            except Exception:
-                pass
+        time_score = self.temporal_score(self._item_epoch(item1), self._item_epoch(item2))
 
         confidence = (
-            image_sim  * 0.40 +
-            text_sim   * 0.35 +
-            loc        * 0.15 +
-            time_score * 0.10 +
+            image_sim  * W_IMAGE +
+            text_sim   * W_TEXT +
+            loc        * W_LOCATION +
+            time_score * W_TIME +
             cat_boost
         )
-        confidence = max(0.0, min(confidence, 0.95))
+        confidence = max(0.0, min(confidence, MAX_CONFIDENCE))
 
         return {
             "is_match":         confidence >= threshold,
@@ -328,6 +883,80 @@ class ProductionAIEngine:
             "temporal_score":   round(time_score,  3),
         }
 
+    # =====================================================
+    # CANDIDATE INDEX  (inner product over stored features)
+    # =====================================================
+    @staticmethod
+    def _as_vector(value) -> Optional[np.ndarray]:
+        if value is None:
+            return None
+        vec = np.asarray(value, dtype=np.float32).ravel()
+        return vec if vec.size else None
+
+    def build_candidate_index(self, candidates: List[Dict]) -> Dict:
+        """
+        Stack stored candidate features into L2-normalised float32 matrices
+        (scored with one C @ q matmul per modality). Build once, then reuse
+        for every query item against the same candidate pool.
+        """
+        items, img_rows, txt_rows = [], [], []
+        for c in candidates:
+            img = self._as_vector(c.get("image_features"))
+            txt = self._as_vector(c.get("text_embedding"))
+            if img is None or txt is None:
+                continue
+            # Skip rows written by a different encoder (dimension mismatch)
+            if img_rows and (img.shape != img_rows[0].shape or txt.shape != txt_rows[0].shape):
+                continue
+            items.append(c)
+            img_rows.append(img)
+            txt_rows.append(txt)
+
+        index = {"items": items}
+        if not items:
+            return index
+
+        img_mat = _normalize_rows(np.vstack(img_rows).astype(np.float32))
+        txt_mat = _normalize_rows(np.vstack(txt_rows).astype(np.float32))
+
+        def coord(c, field):
+            v = c.get(field)
+            return float(v) if v else np.nan   # 0 / None count as unknown, as in location_score
+
+        index.update(
+            img_mat     = img_mat,
+            txt_mat     = txt_mat,
+            lats        = np.array([coord(c, "latitude")  for c in items], dtype=np.float64),
+            lons        = np.array([coord(c, "longitude") for c in items], dtype=np.float64),
+            created_ts  = np.array([self._item_epoch(c) for c in items], dtype=np.float64),
+            categories  = np.array([c.get("category") or "" for c in items], dtype=object),
+        )
+        return index
+
+    def _features_from_dict(self, item: Dict, field: str) -> Optional[np.ndarray]:
+        """
+        Stored feature vector for `field` ("image_features" / "text_embedding"),
+        falling back to the (memoised) extractor only when the row has none.
+        """
+        vec = self._as_vector(item.get(field))
+        if vec is not None:
+            return vec
+        if field == "image_features":
+            if not item.get("image_path"):
+                return None
+            return self.extract_image_features(item["image_path"])
+        return self.extract_text_embedding(
+            f"{item.get('title','')} {item.get('description','')}"
+        )
+
+    def _query_vector(self, item: Dict, field: str) -> Optional[np.ndarray]:
+        """Query-side feature as a normalised (1, d) row."""
+        vec = self._as_vector(self._features_from_dict(item, field))
+        if vec is None:
+            return None
+        norm = np.linalg.norm(vec)
+        return (vec / norm if norm > 0 else vec).reshape(1, -1)
+
     # =====================================================
     # BATCH MATCH
     # =====================================================
@@ -336,20 +965,76 @@ class ProductionAIEngine:
         query_item:      Dict,
         candidates:      Optional[List[Dict]] = None,
         candidate_items: Optional[List[Dict]] = None,
-        threshold:       float = 0.6,
+        threshold:       float = MATCH_THRESHOLD,
         top_k:           int   = 5,
+        index:           Optional[Dict] = None,
     ) -> List[Dict]:
-        if candidates is None:
-            candidates = candidate_items or []
+        """
+        Score query_item against every candidate with one matmul per
+        modality. Pass a prebuilt `index` (see build_candidate_index) to
+        reuse it across queries; otherwise one is built from `candidates`.
+        """
+        if index is None:
+            if candidates is None:
+                candidates = candidate_items or []
+            index = self.build_candidate_index(candidates)
 
-        matches = []
-        for c in candidates:
-            r = self.match_items(query_item, c, threshold)
-            if r["is_match"]:
-                matches.append({**r, "item": c})
+        items = index["items"]
+        if not items:
+            return []
+
+        q_img = self._query_vector(query_item, "image_features")
+        q_txt = self._query_vector(query_item, "text_embedding")
+        if q_img is not None and q_img.shape[1] != index["img_mat"].shape[1]:
+            q_img = None
+        if q_txt is not None and q_txt.shape[1] != index["txt_mat"].shape[1]:
+            q_txt = None
+        if q_img is None and q_txt is None:
+            return []
+
+        # ── Similarities for every candidate: one BLAS sgemv each ───────
+        n       = len(items)
+        img_sim = index["img_mat"] @ q_img[0] if q_img is not None else np.zeros(n, np.float32)
+        txt_sim = index["txt_mat"] @ q_txt[0] if q_txt is not None else np.zeros(n, np.float32)
+        img_sim = img_sim.astype(np.float32, copy=False)
+        txt_sim = txt_sim.astype(np.float32, copy=False)
+        # Raw inner products; anti-correlated candidates contribute nothing
+        np.maximum(img_sim, 0.0, out=img_sim)
+        np.maximum(txt_sim, 0.0, out=txt_sim)
 
-        matches.sort(key=lambda x: x["confidence_score"], reverse=True)
-        return matches[:top_k]
+        # ── Location / time / category, vectorised over candidates ──────
+        loc = self.location_score_vec(
+            query_item.get("latitude"), query_item.get("longitude"),
+            index["lats"], index["lons"],
+        )
+        temporal  = self.temporal_score_vec(self._item_epoch(query_item), index["created_ts"])
+        cat_boost = np.where(
+            index["categories"] == query_item.get("category"), 0.10, -0.05
+        ).astype(np.float32)
+
+        confidence = fuse_scores(img_sim, txt_sim, loc, temporal, cat_boost)
+
+        if n > top_k:
+            best = np.argpartition(-confidence, top_k)[:top_k]
+        else:
+            best = np.arange(n)
+        best = best[np.argsort(-confidence[best])]
+
+        matches = []
+        for j in best:
+            conf = float(confidence[j])
+            if conf < threshold:
+                continue
+            matches.append({
+                "is_match":         True,
+                "confidence_score": round(conf,                3),
+                "image_similarity": round(float(img_sim[j]),   3),
+                "text_similarity":  round(float(txt_sim[j]),   3),
+                "location_score":   round(float(loc[j]),       3),
+                "temporal_score":   round(float(temporal[j]),  3),
+                "item":             items[j],
+            })
+        return matches
 
 
 # =====================================================
@@ -365,5 +1050,6 @@ def get_ai_engine() -> ProductionAIEngine:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
     get_ai_engine()
-    print("✅ AI Engine ready")
\ No newline at end of file
+    log.info("✅ AI Engine ready")
\ No newline at end of file
@@ -0,0 +1,133 @@
+"""
+Findora Cache — Redis for read-heavy endpoints (short TTL) and AI embeddings (long TTL)
+Enabled when REDIS_URL is set; every call is a no-op otherwise.
+"""
+
+import hashlib
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import orjson
+
+REDIS_URL = os.getenv("REDIS_URL", "")
+ENABLED   = bool(REDIS_URL)
+
+STATS_KEY    = "stats:v1"
+ITEMS_PREFIX = "items:v1:"
+ITEMS_GEN    = "items:gen"   # bumped on every write; part of each listing key
+STATS_TTL    = 10   # seconds
+ITEMS_TTL    = 10
+
+EMBED_PREFIX = "emb:v1:"
+EMBED_TTL    = 30 * 86400   # embeddings only change with the model
+EMBED_DTYPE  = np.float16
+
+_redis      = None   # redis.asyncio client (request handlers)
+_redis_sync = None   # blocking client (threadpool / Celery code paths)
+
+if ENABLED:
+    import redis
+    import redis.asyncio as aioredis
+
+    _redis      = aioredis.from_url(REDIS_URL)
+    _redis_sync = redis.Redis.from_url(REDIS_URL)
+
+
+async def items_key(item_type, category, status, limit, cursor=None) -> str:
+    """Listing key under the current generation — stale pages are never read again."""
+    gen = 0
+    if _redis is not None:
+        try:
+            gen = int(await _redis.get(ITEMS_GEN) or 0)
+        except Exception as e:
+            print(f"⚠️  Cache read failed ({ITEMS_GEN}): {e}")
+    return f"{ITEMS_PREFIX}{gen}:{item_type}:{category}:{status}:{limit}:{cursor}"
+
+
+async def get_json(key: str) -> Optional[Any]:
+    if _redis is None:
+        return None
+    try:
+        raw = await _redis.get(key)
+        return orjson.loads(raw) if raw is not None else None
+    except Exception as e:
+        print(f"⚠️  Cache read failed ({key}): {e}")
+        return None
+
+
+async def set_json(key: str, value: Any, ttl: int):
+    if _redis is None:
+        return
+    try:
+        await _redis.set(key, orjson.dumps(value), ex=ttl)
+    except Exception as e:
+        print(f"⚠️  Cache write failed ({key}): {e}")
+
+
+async def invalidate_items():
+    """
+    Drop stats and orphan every cached item listing — call after any item write.
+    O(1): listings from older generations just age out on ITEMS_TTL.
+    """
+    if _redis is None:
+        return
+    try:
+        pipe = _redis.pipeline(transaction=False)
+        pipe.incr(ITEMS_GEN)
+        pipe.unlink(STATS_KEY)
+        await pipe.execute()
+    except Exception as e:
+        print(f"⚠️  Cache invalidation failed: {e}")
+
+
+def invalidate_items_sync():
+    """invalidate_items() for code running outside the event loop."""
+    if _redis_sync is None:
+        return
+    try:
+        pipe = _redis_sync.pipeline(transaction=False)
+        pipe.incr(ITEMS_GEN)
+        pipe.unlink(STATS_KEY)
+        pipe.execute()
+    except Exception as e:
+        print(f"⚠️  Cache invalidation failed: {e}")
+
+
+# ── Embedding cache (sync — used by the feature-extraction batch) ─────────────
+
+def text_embedding_key(text: str) -> str:
+    """Key on whitespace/case-normalised text so trivial edits still hit."""
+    normalized = " ".join(text.lower().split())
+    return EMBED_PREFIX + "text:" + hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+
+
+def image_embedding_key(digest: Optional[str]) -> Optional[str]:
+    return EMBED_PREFIX + "image:" + digest if digest else None
+
+
+def get_embeddings(keys: List[Optional[str]]) -> List[Optional[np.ndarray]]:
+    """float32 vectors aligned with keys; None for misses, None keys or no Redis."""
+    results: List[Optional[np.ndarray]] = [None] * len(keys)
+    live = [j for j, k in enumerate(keys) if k]
+    if _redis_sync is None or not live:
+        return results
+    try:
+        for j, raw in zip(live, _redis_sync.mget([keys[j] for j in live])):
+            if raw is not None:
+                results[j] = np.frombuffer(raw, dtype=EMBED_DTYPE).astype(np.float32)
+    except Exception as e:
+        print(f"⚠️  Embedding cache read failed: {e}")
+    return results
+
+
+def set_embeddings(vectors: Dict[str, np.ndarray]):
+    if _redis_sync is None or not vectors:
+        return
+    try:
+        pipe = _redis_sync.pipeline(transaction=False)
+        for key, vec in vectors.items():
+            pipe.set(key, np.asarray(vec, dtype=EMBED_DTYPE).tobytes(), ex=EMBED_TTL)
+        pipe.execute()
+    except Exception as e:
+        print(f"⚠️  Embedding cache write failed: {e}")
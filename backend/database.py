@@ -3,15 +3,40 @@ Findora Database — PostgreSQL (Supabase)
 FIXED: Uses IPv4 pooler URL compatible with Render free tier
 """
 
+import json
 import psycopg2
 import psycopg2.extras
-import json
+import psycopg2.pool
+import numpy as np
 import os
-from datetime import datetime
-from typing import List, Dict, Optional
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Iterator
 
 DATABASE_URL = os.getenv("DATABASE_URL", "")
 
+# Connection pool — one connection per concurrent request / worker thread
+DB_POOL_MIN   = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX   = int(os.getenv("DB_POOL_MAX", "20"))
+DB_PING_AFTER = 30.0   # seconds idle before a checkout re-validates the connection
+DB_CHECKOUT_TRIES = 3  # dead connections replaced per checkout before giving up
+
+# pg_advisory_xact_lock key: gunicorn workers each run create_tables() at boot
+SCHEMA_LOCK_ID = 0x46494E44   # "FIND"
+
+# Stored feature precision. Similarity math upcasts to float32 on read;
+# feature_dtype records what each row was written with.
+FEATURE_DTYPE = "float16"
+
+# Columns served by the API — everything except the ML feature blobs
+ITEM_COLUMNS = (
+    "item_id, user_id, title, description, category, location, latitude, "
+    "longitude, item_type, reward_amount, contact_info, image_path, status, "
+    "created_at, updated_at"
+)
+
 
 def _clean_url(url: str) -> str:
     """Strip sslmode/ssl query params from URL — psycopg2 takes them as kwargs."""
@@ -39,106 +64,274 @@ def _is_alive(conn) -> bool:
         return False
     try:
         conn.cursor().execute("SELECT 1")
+        conn.rollback()
         return True
     except Exception:
         return False
 
 
+class _ConnectionPool(psycopg2.pool.ThreadedConnectionPool):
+    """
+    Thread-safe pool that opens connections with _connect()'s SSL fallback.
+    Only minconn connections are opened up front, but up to maxconn are kept
+    idle once opened — psycopg2 closes returned connections beyond minconn,
+    which would mean a fresh SSL handshake for every concurrent request.
+    """
+
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self.minconn = maxconn   # retention limit for _putconn; eager opens already done
+
+    def _connect(self, key=None):
+        conn = _connect()
+        if key is not None:
+            self._used[key] = conn
+            self._rused[id(conn)] = key
+        else:
+            self._pool.append(conn)
+        return conn
+
+
 class Database:
 
     def __init__(self):
         if not DATABASE_URL:
             raise ValueError("DATABASE_URL environment variable not set")
         print("🔌 Connecting to database...")
-        self.conn = _connect()
+        self.pool      = _ConnectionPool(DB_POOL_MIN, DB_POOL_MAX)
+        # getconn() raises PoolError when exhausted — make callers wait instead
+        self._slots    = threading.BoundedSemaphore(DB_POOL_MAX)
+        self._last_use = {}   # id(conn) → monotonic time it was returned
         self.create_tables()
-        print("✅ PostgreSQL connected (Supabase)")
-
-    def _cursor(self) -> psycopg2.extras.RealDictCursor:
-        """Return a RealDictCursor, reconnecting if the connection has dropped."""
-        if not _is_alive(self.conn):
-            print("🔄 Reconnecting to database...")
+        print(f"✅ PostgreSQL connected (Supabase, pool {DB_POOL_MIN}–{DB_POOL_MAX})")
+
+    def _checkout(self):
+        """
+        Borrow a connection, blocking until a pool slot is free. The connection
+        is pinged only if it sat idle long enough to be dropped. The caller
+        releases the slot (see _transaction).
+        """
+        self._slots.acquire()
+        try:
+            for _ in range(DB_CHECKOUT_TRIES):
+                conn = self.pool.getconn()
+                idle = time.monotonic() - self._last_use.get(id(conn), 0.0)
+                if idle <= DB_PING_AFTER or _is_alive(conn):
+                    return conn
+                print("🔄 Reconnecting to database...")
+                self._last_use.pop(id(conn), None)
+                self.pool.putconn(conn, close=True)
+            raise psycopg2.OperationalError("no live database connection after reconnecting")
+        except Exception:
+            self._slots.release()
+            raise
+
+    @contextmanager
+    def _transaction(self) -> Iterator[psycopg2.extras.RealDictCursor]:
+        """
+        RealDictCursor on a pooled connection: commit on success, roll back
+        on error. Broken connections are closed instead of going back to the pool.
+        """
+        conn   = self._checkout()
+        broken = False
+        try:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                yield cur
+            conn.commit()
+        except Exception as e:
+            broken = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
             try:
-                self.conn.close()
+                conn.rollback()
             except Exception:
-                pass
-            self.conn = _connect()
-        return self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+                broken = True
+            raise
+        finally:
+            close = broken or bool(conn.closed)
+            if close:
+                self._last_use.pop(id(conn), None)   # id() may be reused by a new connection
+            else:
+                self._last_use[id(conn)] = time.monotonic()
+            try:
+                self.pool.putconn(conn, close=close)
+            finally:
+                self._slots.release()
 
     # ── Schema ────────────────────────────────────────────────────────────────
 
     def create_tables(self):
-        cur = self._cursor()
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS items (
-                item_id        TEXT PRIMARY KEY,
-                user_id        TEXT NOT NULL,
-                title          TEXT NOT NULL,
-                description    TEXT NOT NULL,
-                category       TEXT NOT NULL,
-                location       TEXT NOT NULL,
-                latitude       REAL,
-                longitude      REAL,
-                item_type      TEXT NOT NULL,
-                reward_amount  REAL DEFAULT 0,
-                contact_info   TEXT NOT NULL,
-                image_path     TEXT,
-                status         TEXT DEFAULT 'active',
-                created_at     TEXT NOT NULL,
-                updated_at     TEXT NOT NULL,
-                image_features TEXT,
-                text_embedding TEXT
-            )
-        """)
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS matches (
-                match_id         TEXT PRIMARY KEY,
-                lost_item_id     TEXT NOT NULL,
-                found_item_id    TEXT NOT NULL,
-                confidence_score REAL NOT NULL,
-                image_similarity REAL NOT NULL,
-                text_similarity  REAL NOT NULL,
-                location_score   REAL NOT NULL,
-                status           TEXT DEFAULT 'pending',
-                created_at       TEXT NOT NULL,
-                updated_at       TEXT NOT NULL,
-                UNIQUE(lost_item_id, found_item_id)
-            )
-        """)
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                user_id    TEXT PRIMARY KEY,
-                email      TEXT UNIQUE NOT NULL,
-                name       TEXT NOT NULL,
-                phone      TEXT,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
-            )
-        """)
+        with self._transaction() as cur:
+            # One worker at a time — concurrent CREATE TABLE IF NOT EXISTS can still
+            # collide on pg_type, and the backfills/index swaps should run once
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (SCHEMA_LOCK_ID,))
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS items (
+                    item_id        TEXT PRIMARY KEY,
+                    user_id        TEXT NOT NULL,
+                    title          TEXT NOT NULL,
+                    description    TEXT NOT NULL,
+                    category       TEXT NOT NULL,
+                    location       TEXT NOT NULL,
+                    latitude       REAL,
+                    longitude      REAL,
+                    item_type      TEXT NOT NULL,
+                    reward_amount  REAL DEFAULT 0,
+                    contact_info   TEXT NOT NULL,
+                    image_path     TEXT,
+                    status         TEXT DEFAULT 'active',
+                    created_at     TEXT NOT NULL,
+                    updated_at     TEXT NOT NULL,
+                    image_features BYTEA,
+                    text_embedding BYTEA,
+                    feature_dtype  TEXT DEFAULT 'float32',
+                    image_digest   TEXT,
+                    created_at_ts  BIGINT
+                )
+            """)
+            # Integer epoch alongside created_at so scoring never parses ISO strings
+            cur.execute("ALTER TABLE items ADD COLUMN IF NOT EXISTS created_at_ts BIGINT")
+            cur.execute("ALTER TABLE items ADD COLUMN IF NOT EXISTS image_digest TEXT")
+            # category / item_type are stored lowercase (normalized at parse time)
+            cur.execute("""
+                UPDATE items
+                SET category = lower(category), item_type = lower(item_type)
+                WHERE category <> lower(category) OR item_type <> lower(item_type)
+            """)
+            # Rows written before FP16 storage hold float32 bytes
+            cur.execute("ALTER TABLE items ADD COLUMN IF NOT EXISTS feature_dtype TEXT DEFAULT 'float32'")
+            cur.execute("""
+                UPDATE items
+                SET created_at_ts = EXTRACT(EPOCH FROM created_at::timestamp)::BIGINT
+                WHERE created_at_ts IS NULL
+            """)
+            # Legacy JSON-text feature columns → raw float32 BYTEA
+            self._migrate_json_features(cur)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS matches (
+                    match_id         TEXT PRIMARY KEY,
+                    lost_item_id     TEXT NOT NULL,
+                    found_item_id    TEXT NOT NULL,
+                    confidence_score REAL NOT NULL,
+                    image_similarity REAL NOT NULL,
+                    text_similarity  REAL NOT NULL,
+                    location_score   REAL NOT NULL,
+                    status           TEXT DEFAULT 'pending',
+                    created_at       TEXT NOT NULL,
+                    updated_at       TEXT NOT NULL,
+                    UNIQUE(lost_item_id, found_item_id)
+                )
+            """)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    user_id    TEXT PRIMARY KEY,
+                    email      TEXT UNIQUE NOT NULL,
+                    name       TEXT NOT NULL,
+                    phone      TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS notifications (
+                    id          UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+                    user_id     UUID NOT NULL,
+                    match_id    TEXT,
+                    item_title  TEXT,
+                    confidence  REAL,
+                    read        BOOLEAN DEFAULT FALSE,
+                    created_at  TIMESTAMPTZ DEFAULT NOW()
+                )
+            """)
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_item_type ON items(item_type)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_status    ON items(status)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_created_at_ts ON items(created_at_ts)")
+            # Not UNIQUE — owner and finder may legitimately upload the same photo
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_image_digest ON items(image_digest)")
+            # Match-candidate scans: rows without features are skipped in the B-tree
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_active_typed
+                ON items(status, item_type, created_at DESC)
+                WHERE image_features IS NOT NULL
+            """)
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_matches_lost_conf
+                ON matches(lost_item_id, confidence_score DESC)
+            """)
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_matches_found_conf
+                ON matches(found_item_id, confidence_score DESC)
+            """)
+            # Browse listing: filter + keyset ORDER BY created_at, item_id DESC LIMIT
+            # in one index range scan. INCLUDE carries only fixed-width columns;
+            # free text (title, location, user_id, ...) stays in the heap, since
+            # one long legacy value over the ~2.7 kB B-tree tuple limit would fail
+            # CREATE INDEX here and abort startup.
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS items_list_keyset_ix
+                ON items(status, item_type, category, created_at DESC, item_id DESC)
+                INCLUDE (latitude, longitude, reward_amount)
+            """)
+        print("✅ Database tables ready")
+
+    @staticmethod
+    def _migrate_json_features(cur):
+        """
+        Convert legacy JSON-text feature columns to raw float32 BYTEA in place:
+        decode each row into a new column, then swap it in. No vectors are lost.
+        """
         cur.execute("""
-            CREATE TABLE IF NOT EXISTS notifications (
-                id          UUID DEFAULT gen_random_uuid() PRIMARY KEY,
-                user_id     UUID NOT NULL,
-                match_id    TEXT,
-                item_title  TEXT,
-                confidence  REAL,
-                read        BOOLEAN DEFAULT FALSE,
-                created_at  TIMESTAMPTZ DEFAULT NOW()
-            )
+            SELECT column_name FROM information_schema.columns
+            WHERE table_name = 'items'
+              AND column_name IN ('image_features', 'text_embedding')
+              AND data_type = 'text'
         """)
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_item_type ON items(item_type)")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_status    ON items(status)")
-        self.conn.commit()
-        print("✅ Database tables ready")
+        for col in [row["column_name"] for row in cur.fetchall()]:
+            tmp = f"{col}_bin"
+            cur.execute(f"ALTER TABLE items ADD COLUMN IF NOT EXISTS {tmp} BYTEA")
+            cur.execute(f"SELECT item_id, {col} AS raw FROM items WHERE {col} IS NOT NULL")
+            converted = []
+            for row in cur.fetchall():
+                try:
+                    vec = np.asarray(json.loads(row["raw"]), dtype=np.float32).ravel()
+                except (TypeError, ValueError):
+                    continue
+                if vec.size:
+                    converted.append((row["item_id"], psycopg2.Binary(vec.tobytes())))
+            if converted:
+                psycopg2.extras.execute_values(cur, f"""
+                    UPDATE items SET {tmp} = v.data, feature_dtype = 'float32'
+                    FROM (VALUES %s) AS v(item_id, data)
+                    WHERE items.item_id = v.item_id
+                """, converted)
+            cur.execute(f"ALTER TABLE items DROP COLUMN {col}")
+            cur.execute(f"ALTER TABLE items RENAME COLUMN {tmp} TO {col}")
+            print(f"🔧 Migrated items.{col} → BYTEA ({len(converted)} vectors kept)")
 
     # ── Helpers ───────────────────────────────────────────────────────────────
 
     @staticmethod
-    def _parse_json_fields(item: Dict) -> Dict:
+    def _epoch_seconds(iso_ts: str) -> int:
+        """Epoch seconds for an ISO timestamp; naive values are UTC (as written by us)."""
+        dt = datetime.fromisoformat(iso_ts)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return int(dt.timestamp())
+
+    @staticmethod
+    def _encode_vector(vec) -> Optional[psycopg2.extensions.Binary]:
+        """Serialise a feature vector as raw FEATURE_DTYPE bytes."""
+        if vec is None:
+            return None
+        arr = np.asarray(vec, dtype=FEATURE_DTYPE)
+        return psycopg2.Binary(arr.tobytes()) if arr.size else None
+
+    @staticmethod
+    def _parse_feature_fields(item: Dict) -> Dict:
+        dtype = item.pop("feature_dtype", None) or "float32"
         for field in ("image_features", "text_embedding"):
-            if item.get(field):
+            raw = item.get(field)
+            if raw is not None:
                 try:
-                    item[field] = json.loads(item[field])
+                    item[field] = np.frombuffer(raw, dtype=dtype).astype(np.float32)
                 except Exception:
                     item[field] = None
         return item
@@ -147,203 +340,280 @@ class Database:
 
     def insert_item(self, item: Dict) -> bool:
         try:
-            cur = self._cursor()
-            cur.execute("""
-                INSERT INTO items (
-                    item_id, user_id, title, description, category,
-                    location, latitude, longitude, item_type, reward_amount,
-                    contact_info, image_path, status, created_at, updated_at,
-                    image_features, text_embedding
-                ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-            """, (
-                item["item_id"],   item["user_id"],    item["title"],
-                item["description"], item["category"], item["location"],
-                item.get("latitude"), item.get("longitude"),
-                item["item_type"],    item.get("reward_amount", 0),
-                item["contact_info"], item.get("image_path"),
-                item.get("status", "active"),
-                item["created_at"],   item["updated_at"],
-                json.dumps(item["image_features"]) if item.get("image_features") else None,
-                json.dumps(item["text_embedding"]) if item.get("text_embedding") else None,
-            ))
-            self.conn.commit()
+            with self._transaction() as cur:
+                cur.execute("""
+                    INSERT INTO items (
+                        item_id, user_id, title, description, category,
+                        location, latitude, longitude, item_type, reward_amount,
+                        contact_info, image_path, status, created_at, updated_at,
+                        image_features, text_embedding, feature_dtype, image_digest,
+                        created_at_ts
+                    ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+                """, (
+                    item["item_id"],   item["user_id"],    item["title"],
+                    item["description"], item["category"], item["location"],
+                    item.get("latitude"), item.get("longitude"),
+                    item["item_type"],    item.get("reward_amount", 0),
+                    item["contact_info"], item.get("image_path"),
+                    item.get("status", "active"),
+                    item["created_at"],   item["updated_at"],
+                    self._encode_vector(item.get("image_features")),
+                    self._encode_vector(item.get("text_embedding")),
+                    FEATURE_DTYPE,         item.get("image_digest"),
+                    item.get("created_at_ts") or self._epoch_seconds(item["created_at"]),
+                ))
             return True
         except Exception as e:
-            self.conn.rollback()
             print(f"❌ Error inserting item: {e}")
             return False
 
-    def get_item(self, item_id: str) -> Optional[Dict]:
-        cur = self._cursor()
-        cur.execute("SELECT * FROM items WHERE item_id = %s", (item_id,))
-        row = cur.fetchone()
-        return self._parse_json_fields(dict(row)) if row else None
-
-    def get_all_items(self, item_type=None, status="active", limit=50) -> List[Dict]:
-        """status=None → all items; status='active' → only active; etc."""
-        cur = self._cursor()
+    def get_item(self, item_id: str, include_features: bool = False) -> Optional[Dict]:
+        """API-shaped row; include_features=True adds the decoded ML vectors."""
+        columns = ITEM_COLUMNS
+        if include_features:
+            columns += ", image_features, text_embedding, feature_dtype, image_digest, created_at_ts"
+        with self._transaction() as cur:
+            cur.execute(f"SELECT {columns} FROM items WHERE item_id = %s", (item_id,))
+            row = cur.fetchone()
+            if not row:
+                return None
+            return self._parse_feature_fields(dict(row)) if include_features else dict(row)
+
+    def get_by_digest(self, digest: str) -> Optional[Dict]:
+        """Image URL (+ features, once extracted) of an earlier upload with this digest."""
+        with self._transaction() as cur:
+            cur.execute("""
+                SELECT image_path, image_features, feature_dtype
+                FROM items
+                WHERE image_digest = %s AND image_path IS NOT NULL
+                ORDER BY (image_features IS NULL), created_at DESC
+                LIMIT 1
+            """, (digest,))
+            row = cur.fetchone()
+            return self._parse_feature_fields(dict(row)) if row else None
+
+    def get_all_items(self, item_type=None, status="active", limit=50,
+                      category=None, after=None) -> List[Dict]:
+        """status=None → all items; status='active' → only active; etc.
+        after=(created_at, item_id) of the previous page's last row (keyset).
+        Feature vectors are not selected — use get_match_candidates for those."""
         if status is None:
-            query, params = "SELECT * FROM items WHERE 1=1", []
+            query, params = f"SELECT {ITEM_COLUMNS} FROM items WHERE 1=1", []
         else:
-            query, params = "SELECT * FROM items WHERE status = %s", [status]
+            query, params = f"SELECT {ITEM_COLUMNS} FROM items WHERE status = %s", [status]
 
         if item_type:
             query += " AND item_type = %s"
             params.append(item_type)
 
-        query += " ORDER BY created_at DESC LIMIT %s"
+        if category:
+            query += " AND category = %s"
+            params.append(category)
+
+        if after:
+            query += " AND (created_at, item_id) < (%s, %s)"
+            params.extend(after)
+
+        query += " ORDER BY created_at DESC, item_id DESC LIMIT %s"
         params.append(limit)
-        cur.execute(query, params)
-        return [self._parse_json_fields(dict(row)) for row in cur.fetchall()]
+        with self._transaction() as cur:
+            cur.execute(query, params)
+            return [dict(row) for row in cur.fetchall()]
+
+    def get_stats_counts(self) -> Dict:
+        """Item counts keyed by (item_type, status) — one GROUP BY, no rows shipped."""
+        with self._transaction() as cur:
+            cur.execute("""
+                SELECT item_type, status, COUNT(*) AS n
+                FROM items GROUP BY item_type, status
+            """)
+            return {(r["item_type"], r["status"]): r["n"] for r in cur.fetchall()}
 
     def update_item(self, item_id: str, updates: Dict) -> bool:
         try:
-            updates["updated_at"] = datetime.utcnow().isoformat()
-            cur    = self._cursor()
+            updates["updated_at"] = datetime.now(timezone.utc).isoformat()
             keys   = ", ".join(f"{k}=%s" for k in updates)
             values = list(updates.values()) + [item_id]
-            cur.execute(f"UPDATE items SET {keys} WHERE item_id = %s", values)
-            self.conn.commit()
+            with self._transaction() as cur:
+                cur.execute(f"UPDATE items SET {keys} WHERE item_id = %s", values)
             return True
         except Exception as e:
-            self.conn.rollback()
             print(f"❌ Error updating item: {e}")
             return False
 
+    def get_match_candidates(self, item_type: str, status: str = "active", limit: int = 100) -> List[Dict]:
+        """
+        Only the columns batch matching needs, for rows that already have
+        features. Use get_item() to load the full row of a matched item.
+        """
+        with self._transaction() as cur:
+            cur.execute("""
+                SELECT item_id, category, latitude, longitude, created_at_ts,
+                       image_features, text_embedding, feature_dtype
+                FROM items
+                WHERE status = %s AND item_type = %s
+                  AND image_features IS NOT NULL AND text_embedding IS NOT NULL
+                ORDER BY created_at DESC LIMIT %s
+            """, (status, item_type, limit))
+            return [self._parse_feature_fields(dict(row)) for row in cur.fetchall()]
+
     def get_items_without_features(self, limit: int = 10) -> List[Dict]:
-        cur = self._cursor()
-        cur.execute("""
-            SELECT * FROM items
-            WHERE status = 'active'
-              AND (image_features IS NULL OR text_embedding IS NULL)
-            ORDER BY created_at ASC LIMIT %s
-        """, (limit,))
-        return [self._parse_json_fields(dict(row)) for row in cur.fetchall()]
+        with self._transaction() as cur:
+            cur.execute("""
+                SELECT item_id, title, description, image_path, item_type,
+                       image_features, text_embedding, feature_dtype
+                FROM items
+                WHERE status = 'active'
+                  AND (image_features IS NULL OR text_embedding IS NULL)
+                ORDER BY created_at ASC LIMIT %s
+            """, (limit,))
+            return [self._parse_feature_fields(dict(row)) for row in cur.fetchall()]
 
     def update_item_features(self, item_id: str, image_features, text_embedding) -> bool:
         try:
-            cur = self._cursor()
-            cur.execute("""
-                UPDATE items
-                SET image_features=%s, text_embedding=%s, updated_at=%s
-                WHERE item_id=%s
-            """, (
-                json.dumps(image_features), json.dumps(text_embedding),
-                datetime.utcnow().isoformat(), item_id,
-            ))
-            self.conn.commit()
+            with self._transaction() as cur:
+                cur.execute("""
+                    UPDATE items
+                    SET image_features=%s, text_embedding=%s, feature_dtype=%s, updated_at=%s
+                    WHERE item_id=%s
+                """, (
+                    self._encode_vector(image_features), self._encode_vector(text_embedding),
+                    FEATURE_DTYPE, datetime.now(timezone.utc).isoformat(), item_id,
+                ))
             return True
         except Exception as e:
-            self.conn.rollback()
             print(f"❌ Error updating features: {e}")
             return False
 
     # ── Matches ───────────────────────────────────────────────────────────────
 
-    def match_exists(self, lost_item_id: str, found_item_id: str) -> bool:
-        cur = self._cursor()
-        cur.execute("""
-            SELECT 1 FROM matches WHERE lost_item_id=%s AND found_item_id=%s
-        """, (lost_item_id, found_item_id))
-        return cur.fetchone() is not None
-
     def insert_match(self, match: Dict) -> bool:
-        if self.match_exists(match["lost_item_id"], match["found_item_id"]):
-            return False
+        """Insert one match; False when the (lost, found) pair already exists."""
         try:
-            cur = self._cursor()
-            cur.execute("""
-                INSERT INTO matches
-                    (match_id, lost_item_id, found_item_id,
-                     confidence_score, image_similarity, text_similarity,
-                     location_score, status, created_at, updated_at)
-                VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-            """, (
-                match["match_id"],         match["lost_item_id"],
-                match["found_item_id"],    match["confidence_score"],
-                match["image_similarity"], match["text_similarity"],
-                match["location_score"],   match.get("status", "pending"),
-                match["created_at"],       match["updated_at"],
-            ))
-            self.conn.commit()
-            return True
+            with self._transaction() as cur:
+                cur.execute("""
+                    INSERT INTO matches
+                        (match_id, lost_item_id, found_item_id,
+                         confidence_score, image_similarity, text_similarity,
+                         location_score, status, created_at, updated_at)
+                    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+                    ON CONFLICT (lost_item_id, found_item_id) DO NOTHING
+                """, (
+                    match["match_id"],         match["lost_item_id"],
+                    match["found_item_id"],    match["confidence_score"],
+                    match["image_similarity"], match["text_similarity"],
+                    match["location_score"],   match.get("status", "pending"),
+                    match["created_at"],       match["updated_at"],
+                ))
+                inserted = cur.rowcount > 0
+            return inserted
         except Exception as e:
-            self.conn.rollback()
             print(f"❌ Error inserting match: {e}")
             return False
 
-    def get_matches_for_item(self, item_id: str) -> List[Dict]:
-        cur = self._cursor()
-        cur.execute("""
-            SELECT * FROM matches
-            WHERE lost_item_id=%s OR found_item_id=%s
-            ORDER BY confidence_score DESC
-        """, (item_id, item_id))
-        return [dict(row) for row in cur.fetchall()]
+    def insert_matches_bulk(self, matches: List[Dict]) -> List[Dict]:
+        """
+        Insert many matches in one transaction (single round-trip per page).
+        Existing (lost, found) pairs are skipped; returns the rows inserted.
+        """
+        if not matches:
+            return []
+        try:
+            with self._transaction() as cur:
+                rows = psycopg2.extras.execute_values(cur, """
+                    INSERT INTO matches
+                        (match_id, lost_item_id, found_item_id,
+                         confidence_score, image_similarity, text_similarity,
+                         location_score, status, created_at, updated_at)
+                    VALUES %s
+                    ON CONFLICT (lost_item_id, found_item_id) DO NOTHING
+                    RETURNING match_id, lost_item_id, found_item_id
+                """, [(
+                    m["match_id"],         m["lost_item_id"],
+                    m["found_item_id"],    m["confidence_score"],
+                    m["image_similarity"], m["text_similarity"],
+                    m["location_score"],   m.get("status", "pending"),
+                    m["created_at"],       m["updated_at"],
+                ) for m in matches], fetch=True)
+            return [dict(r) for r in rows]
+        except Exception as e:
+            print(f"❌ Error bulk-inserting matches: {e}")
+            return []
+
+    def get_matches_for_item(self, item_id: str, limit: int = 50) -> List[Dict]:
+        """Top `limit` matches by confidence. Each branch walks its own
+        (item_id, confidence_score DESC) index instead of sorting an OR scan."""
+        with self._transaction() as cur:
+            cur.execute("""
+                (SELECT * FROM matches WHERE lost_item_id=%s
+                 ORDER BY confidence_score DESC LIMIT %s)
+                UNION ALL
+                (SELECT * FROM matches WHERE found_item_id=%s
+                 ORDER BY confidence_score DESC LIMIT %s)
+                ORDER BY confidence_score DESC
+                LIMIT %s
+            """, (item_id, limit, item_id, limit, limit))
+            return [dict(row) for row in cur.fetchall()]
 
     # ── Users ─────────────────────────────────────────────────────────────────
 
     def insert_user(self, user: Dict) -> bool:
         try:
-            cur = self._cursor()
-            cur.execute("""
-                INSERT INTO users (user_id, email, name, phone, created_at, updated_at)
-                VALUES (%s,%s,%s,%s,%s,%s)
-            """, (
-                user["user_id"], user["email"], user["name"],
-                user.get("phone", ""), user["created_at"], user["updated_at"],
-            ))
-            self.conn.commit()
+            with self._transaction() as cur:
+                cur.execute("""
+                    INSERT INTO users (user_id, email, name, phone, created_at, updated_at)
+                    VALUES (%s,%s,%s,%s,%s,%s)
+                """, (
+                    user["user_id"], user["email"], user["name"],
+                    user.get("phone", ""), user["created_at"], user["updated_at"],
+                ))
             return True
         except Exception as e:
-            self.conn.rollback()
             print(f"❌ Error inserting user: {e}")
             return False
 
     def get_user(self, user_id: str) -> Optional[Dict]:
-        cur = self._cursor()
-        cur.execute("SELECT * FROM users WHERE user_id=%s", (user_id,))
-        row = cur.fetchone()
-        return dict(row) if row else None
+        with self._transaction() as cur:
+            cur.execute("SELECT * FROM users WHERE user_id=%s", (user_id,))
+            row = cur.fetchone()
+            return dict(row) if row else None
 
     # ── Notifications ─────────────────────────────────────────────────────────
 
     def insert_notification(self, user_id: str, match_id: str, item_title: str, confidence: float) -> bool:
         try:
-            cur = self._cursor()
-            cur.execute("""
-                INSERT INTO notifications (id, user_id, match_id, item_title, confidence, read, created_at)
-                VALUES (gen_random_uuid(), %s, %s, %s, %s, FALSE, NOW())
-            """, (user_id, match_id, item_title, confidence))
-            self.conn.commit()
+            with self._transaction() as cur:
+                cur.execute("""
+                    INSERT INTO notifications (id, user_id, match_id, item_title, confidence, read, created_at)
+                    VALUES (gen_random_uuid(), %s, %s, %s, %s, FALSE, NOW())
+                """, (user_id, match_id, item_title, confidence))
             print(f"🔔 Notification inserted for user {user_id[:8]}...")
             return True
         except Exception as e:
-            self.conn.rollback()
             print(f"⚠️  Notification insert failed (user may not be auth user): {e}")
             return False
 
     def get_notifications(self, user_id: str, limit: int = 50) -> List[Dict]:
         try:
-            cur = self._cursor()
-            cur.execute("""
-                SELECT id, user_id, match_id, item_title, confidence, read, created_at
-                FROM notifications
-                WHERE user_id = %s
-                ORDER BY created_at DESC
-                LIMIT %s
-            """, (user_id, limit))
-            rows = cur.fetchall()
-            result = []
-            for row in rows:
-                d = dict(row)
-                # Convert UUID/datetime to strings for JSON serialization
-                d["id"] = str(d["id"])
-                d["user_id"] = str(d["user_id"])
-                if d.get("created_at"):
-                    d["created_at"] = str(d["created_at"])
-                result.append(d)
-            return result
+            with self._transaction() as cur:
+                cur.execute("""
+                    SELECT id, user_id, match_id, item_title, confidence, read, created_at
+                    FROM notifications
+                    WHERE user_id = %s
+                    ORDER BY created_at DESC
+                    LIMIT %s
+                """, (user_id, limit))
+                rows = cur.fetchall()
+                result = []
+                for row in rows:
+                    d = dict(row)
+                    # Convert UUID/datetime to strings for JSON serialization
+                    d["id"] = str(d["id"])
+                    d["user_id"] = str(d["user_id"])
+                    if d.get("created_at"):
+                        d["created_at"] = str(d["created_at"])
+                    result.append(d)
+                return result
         except Exception as e:
             print(f"⚠️  Get notifications failed: {e}")
             return []
@@ -352,16 +622,14 @@ class Database:
         if not notification_ids:
             return True
         try:
-            cur = self._cursor()
             placeholders = ",".join(["%s"] * len(notification_ids))
-            cur.execute(
-                f"UPDATE notifications SET read = TRUE WHERE id IN ({placeholders})",
-                notification_ids,
-            )
-            self.conn.commit()
+            with self._transaction() as cur:
+                cur.execute(
+                    f"UPDATE notifications SET read = TRUE WHERE id IN ({placeholders})",
+                    notification_ids,
+                )
             return True
         except Exception as e:
-            self.conn.rollback()
             print(f"⚠️  Mark notifications read failed: {e}")
             return False
 
@@ -370,22 +638,20 @@ class Database:
     def delete_item(self, item_id: str, user_id: str) -> bool:
         """Delete an item only if it belongs to the given user."""
         try:
-            cur = self._cursor()
-            cur.execute(
-                "DELETE FROM items WHERE item_id = %s AND user_id = %s",
-                (item_id, user_id),
-            )
-            deleted = cur.rowcount > 0
-            self.conn.commit()
+            with self._transaction() as cur:
+                cur.execute(
+                    "DELETE FROM items WHERE item_id = %s AND user_id = %s",
+                    (item_id, user_id),
+                )
+                deleted = cur.rowcount > 0
             return deleted
         except Exception as e:
-            self.conn.rollback()
             print(f"❌ Error deleting item: {e}")
             return False
 
     def close(self):
         try:
-            self.conn.close()
+            self.pool.closeall()
         except Exception:
             pass
 
@@ -7,12 +7,18 @@ FINDORA - FastAPI Backend v3
 - Keep-alive: /ping endpoint (frontend pings every 8 min)
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, BackgroundTasks, Request
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, BackgroundTasks, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
 from typing import Optional, List
-from datetime import datetime
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 from pydantic import BaseModel
+import asyncio
+import base64
+import hashlib
+import logging
 import uuid
 import os
 import re
@@ -23,8 +29,22 @@ from database import db
 from models import (
     UserCreate, UserResponse, ItemResponse, MatchResponse,
     HealthResponse, validate_category, validate_item_type,
+    normalize_choice, ItemListAdapter, MatchListAdapter,
 )
 from notifications import notify_match
+from tasks import CELERY_ENABLED, embed_items
+import cache
+
+# ── Logging ───────────────────────────────────────────────────────────────────
+# ai.engine / ai.agent log under "findora.*"; gunicorn and uvicorn only set up
+# their own loggers, so give ours a handler or INFO records are dropped.
+_findora_log = logging.getLogger("findora")
+if not _findora_log.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    _findora_log.addHandler(_handler)
+    _findora_log.setLevel(logging.INFO)
+    _findora_log.propagate = False
 
 # ── Cloudinary config ─────────────────────────────────────────────────────────
 cloudinary.config(
@@ -35,10 +55,25 @@ cloudinary.config(
 )
 
 # ── App ───────────────────────────────────────────────────────────────────────
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _ai_queue
+    _ai_queue = asyncio.Queue()
+    worker    = asyncio.create_task(_ai_batch_worker())
+    try:
+        yield
+    finally:
+        worker.cancel()
+        _ai_queue = None
+        db.close()
+
+
 app = FastAPI(
     title       = "Findora API",
     description = "AI-Powered Lost & Found",
     version     = "3.0.0",
+    lifespan    = lifespan,
+    default_response_class = ORJSONResponse,
 )
 
 
@@ -46,7 +81,7 @@ app = FastAPI(
 @app.get('/ping')
 async def ping():
     """Health check endpoint - prevents Render spindown"""
-    return {'status': 'ok', 'timestamp': datetime.now().isoformat()}
+    return {'status': 'ok', 'timestamp': datetime.now(timezone.utc).isoformat()}
 
 
 @app.get('/health')
@@ -56,7 +91,7 @@ async def health():
         'status': 'healthy',
         'app': 'findora',
         'version': '2.0',
-        'timestamp': datetime.now().isoformat()
+        'timestamp': datetime.now(timezone.utc).isoformat()
     }
 
 
@@ -66,14 +101,32 @@ app.add_middleware(
     allow_credentials = False,
     allow_methods     = ["*"],
     allow_headers     = ["*"],
+    expose_headers    = ["X-Next-Cursor"],
 )
 
 # ── Image helpers ─────────────────────────────────────────────────────────────
 
+UPLOAD_CHUNK_SIZE = 6 * 1024 * 1024   # Cloudinary's chunked API wants ≥ 5 MB parts
+DIGEST_CHUNK_SIZE = 1024 * 1024
+
+
+def image_digest(file: UploadFile) -> str:
+    """BLAKE2b-256 of the upload, read in chunks from the spooled file."""
+    h = hashlib.blake2b(digest_size=32)
+    file.file.seek(0)
+    while chunk := file.file.read(DIGEST_CHUNK_SIZE):
+        h.update(chunk)
+    file.file.seek(0)
+    return h.hexdigest()
+
+
 def save_image(file: UploadFile, item_id: str) -> str:
-    """Upload image to Cloudinary and return the permanent https:// URL."""
-    result = cloudinary.uploader.upload(
+    """Stream an upload to Cloudinary in chunks; return the permanent https:// URL.
+    Blocking — call through run_in_threadpool from async handlers."""
+    file.file.seek(0)
+    result = cloudinary.uploader.upload_large(
         file.file,
+        chunk_size    = UPLOAD_CHUNK_SIZE,
         public_id     = f"findora/{item_id}",
         overwrite     = True,
         resource_type = "image",
@@ -89,7 +142,7 @@ async def health_check():
         status    = "healthy",
         service   = "Findora API",
         version   = "3.0.0",
-        timestamp = datetime.utcnow().isoformat(),
+        timestamp = datetime.now(timezone.utc).isoformat(),
         database  = "PostgreSQL/Supabase",
     )
 # ── Users ─────────────────────────────────────────────────────────────────────
@@ -97,7 +150,7 @@ async def health_check():
 @app.post("/api/users/register", response_model=UserResponse)
 async def register_user(user: UserCreate):
     uid = str(uuid.uuid4())
-    ts  = datetime.utcnow().isoformat()
+    ts  = datetime.now(timezone.utc).isoformat()
     data = {
         "user_id":    uid,
         "email":      user.email,
@@ -106,21 +159,12 @@ async def register_user(user: UserCreate):
         "created_at": ts,
         "updated_at": ts,
     }
-    if not db.insert_user(data):
+    if not await run_in_threadpool(db.insert_user, data):
         raise HTTPException(status_code=500, detail="User registration failed")
     return UserResponse(**data)
 
 # ── Items ─────────────────────────────────────────────────────────────────────
 
-def _enrich_item(item: dict) -> dict:
-    """Strip heavy ML fields before returning to client."""
-    item = dict(item)
-    item.pop("image_features", None)
-    item.pop("text_embedding",  None)
-    # image_path is already an absolute Cloudinary URL — no transformation needed
-    return item
-
-
 @app.post("/api/items/report", response_model=ItemResponse)
 async def report_item(
     background_tasks: BackgroundTasks,
@@ -136,21 +180,32 @@ async def report_item(
     user_id:        str            = Form(...),
     image:          UploadFile     = File(...),
 ):
+    item_type = normalize_choice(item_type)
+    category  = normalize_choice(category)
     if not validate_item_type(item_type):
         raise HTTPException(status_code=400, detail="Invalid item type")
     if not validate_category(category):
         raise HTTPException(status_code=400, detail="Invalid category")
 
     item_id = str(uuid.uuid4())
-    ts      = datetime.utcnow().isoformat()
+    now     = datetime.now(timezone.utc)   # one clock read for every timestamp below
+    ts      = now.isoformat()
 
-    # Upload to Cloudinary — returns a permanent https:// URL
-    try:
-        image_url = save_image(image, item_id)
-        print(f"✅ Image uploaded to Cloudinary: {image_url}")
-    except Exception as e:
-        print(f"❌ Cloudinary upload failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Image upload failed: {e}")
+    # Same photo reported before → reuse its URL and image features
+    digest   = await run_in_threadpool(image_digest, image)
+    existing = await run_in_threadpool(db.get_by_digest, digest)
+
+    if existing:
+        image_url = existing["image_path"]
+        print(f"♻️  Duplicate image — reusing {image_url}")
+    else:
+        # Upload to Cloudinary — returns a permanent https:// URL
+        try:
+            image_url = await run_in_threadpool(save_image, image, item_id)
+            print(f"✅ Image uploaded to Cloudinary: {image_url}")
+        except Exception as e:
+            print(f"❌ Cloudinary upload failed: {e}")
+            raise HTTPException(status_code=500, detail=f"Image upload failed: {e}")
 
     item = {
         "item_id":       item_id,
@@ -165,19 +220,44 @@ async def report_item(
         "reward_amount": reward_amount or 0,
         "contact_info":  contact_info,
         "image_path":    image_url,   # Cloudinary URL stored directly
+        "image_digest":  digest,
+        "image_features": existing.get("image_features") if existing else None,
         "status":        "active",
         "created_at":    ts,
+        "created_at_ts": int(now.timestamp()),
         "updated_at":    ts,
     }
 
-    if not db.insert_item(item):
+    if not await run_in_threadpool(db.insert_item, item):
         raise HTTPException(status_code=500, detail="Item submission failed")
+    await cache.invalidate_items()
 
     # Trigger both fast keyword match AND deep AI match in background
     background_tasks.add_task(trigger_fast_matching,   item_id)
     background_tasks.add_task(trigger_ai_processing,   item_id)
 
-    return ItemResponse(**_enrich_item(item))
+    return ItemResponse(**item)   # ML fields aren't in the model — dropped on construction
+
+
+def _encode_cursor(item: dict) -> str:
+    raw = f"{item['created_at']}|{item['item_id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        created_at, item_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return created_at, item_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _page_response(items: list, limit: int) -> ORJSONResponse:
+    """Body stays a plain list; a full page advertises the next keyset cursor."""
+    response = ORJSONResponse(items)
+    if len(items) == limit:
+        response.headers["X-Next-Cursor"] = _encode_cursor(items[-1])
+    return response
 
 
 @app.get("/api/items", response_model=List[ItemResponse])
@@ -185,44 +265,71 @@ async def list_items(
     item_type: Optional[str] = None,
     category:  Optional[str] = None,
     status:    Optional[str] = None,   # None → active + matched (all)
-    limit:     int           = 50,
+    limit:     int           = Query(50, ge=1, le=200),
+    cursor:    Optional[str] = None,   # X-Next-Cursor from the previous page
 ):
-    items = db.get_all_items(item_type=item_type, status=status, limit=limit)
-    if category:
-        items = [i for i in items if i["category"] == category]
-    return [ItemResponse(**_enrich_item(i)) for i in items]
+    # Stored values are canonical lowercase — normalize filters the same way
+    item_type = normalize_choice(item_type) if item_type else None
+    category  = normalize_choice(category)  if category  else None
+    status    = normalize_choice(status)    if status    else None
+
+    after  = _decode_cursor(cursor) if cursor else None
+    key    = await cache.items_key(item_type, category, status, limit, cursor)
+    cached = await cache.get_json(key)
+    if cached is not None:
+        return _page_response(cached, limit)
+
+    rows  = await run_in_threadpool(
+        db.get_all_items, item_type=item_type, status=status,
+        limit=limit, category=category, after=after,
+    )
+    # Our own rows (ITEM_COLUMNS) — construct without validation, dump the
+    # page in one pydantic-core call, and cache that JSON-ready list
+    items = ItemListAdapter.dump_python(
+        [ItemResponse.model_construct(**r) for r in rows], mode="json"
+    )
+    await cache.set_json(key, items, cache.ITEMS_TTL)
+    return _page_response(items, limit)
 
 
 @app.get("/api/items/{item_id}", response_model=ItemResponse)
 async def get_item(item_id: str):
-    item = db.get_item(item_id)
+    item = await run_in_threadpool(db.get_item, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
-    return ItemResponse(**_enrich_item(item))
+    return ItemResponse(**item)
 
 # ── Matches ───────────────────────────────────────────────────────────────────
 
 @app.get("/api/matches/{item_id}", response_model=List[MatchResponse])
-async def get_matches(item_id: str):
-    matches = db.get_matches_for_item(item_id)
-    matches.sort(key=lambda x: x["confidence_score"], reverse=True)
-    return [MatchResponse(**m) for m in matches]
+async def get_matches(item_id: str, limit: int = Query(50, ge=1, le=200)):
+    matches = await run_in_threadpool(db.get_matches_for_item, item_id, limit=limit)
+    return ORJSONResponse(
+        MatchListAdapter.dump_python(
+            [MatchResponse.model_construct(**m) for m in matches], mode="json"
+        )
+    )
 
 # ── Stats ─────────────────────────────────────────────────────────────────────
 
 @app.get("/api/stats")
 async def get_stats():
+    cached = await cache.get_json(cache.STATS_KEY)
+    if cached is not None:
+        return cached
     try:
-        all_items = db.get_all_items(status=None, limit=1000)
-        return {
-            "total_items":   len(all_items),
-            "lost_items":    sum(1 for i in all_items if i.get("item_type") == "lost"),
-            "found_items":   sum(1 for i in all_items if i.get("item_type") == "found"),
-            "matched_items": sum(1 for i in all_items if i.get("status")    == "matched"),
+        counts = await run_in_threadpool(db.get_stats_counts)
+        stats  = {
+            "total_items":   sum(counts.values()),
+            "lost_items":    sum(n for (t, _), n in counts.items() if t == "lost"),
+            "found_items":   sum(n for (t, _), n in counts.items() if t == "found"),
+            "matched_items": sum(n for (_, st), n in counts.items() if st == "matched"),
         }
     except Exception as e:
         print(f"❌ Stats error: {e}")
         raise HTTPException(status_code=500, detail="Stats calculation failed")
+    await cache.set_json(cache.STATS_KEY, stats, cache.STATS_TTL)
+    return stats
 
 # ── Notifications ─────────────────────────────────────────────────────────────
 
@@ -230,7 +337,7 @@ async def get_stats():
 async def get_notifications(user_id: str):
     """Return notifications for a user (newest first)."""
     try:
-        notifs = db.get_notifications(user_id, limit=50)
+        notifs = await run_in_threadpool(db.get_notifications, user_id, limit=50)
         return notifs
     except Exception as e:
         print(f"❌ Notifications error: {e}")
@@ -244,7 +351,7 @@ class MarkReadRequest(BaseModel):
 @app.post("/api/notifications/mark-read")
 async def mark_notifications_read(body: MarkReadRequest):
     """Mark notification IDs as read."""
-    db.mark_notifications_read(body.notification_ids)
+    await run_in_threadpool(db.mark_notifications_read, body.notification_ids)
     return {"ok": True}
 
 # ── Delete Item ───────────────────────────────────────────────────────────────
@@ -255,9 +362,10 @@ async def delete_item(item_id: str, request: Request):
     user_id = request.headers.get("x-user-id", "")
     if not user_id:
         raise HTTPException(status_code=401, detail="Missing X-User-Id header")
-    deleted = db.delete_item(item_id, user_id)
+    deleted = await run_in_threadpool(db.delete_item, item_id, user_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Item not found or unauthorized")
+    await cache.invalidate_items()
     return {"ok": True, "deleted": item_id}
 
 # ── Fast keyword matching (always runs, no ML deps) ───────────────────────────
@@ -296,8 +404,8 @@ def _keyword_match_score(a: dict, b: dict) -> float:
     return min(title_score * 0.55 + desc_score * 0.30 + cat_bonus + 0.05, 0.90)
 
 
-async def trigger_fast_matching(item_id: str):
-    """Keyword-based matching — fast, runs immediately after submission."""
+def trigger_fast_matching(item_id: str):
+    """Keyword-based matching — fast, runs right after submission (in the threadpool)."""
     print(f"⚡ Fast keyword matching: {item_id}")
     item = db.get_item(item_id)
     if not item:
@@ -333,8 +441,9 @@ async def trigger_fast_matching(item_id: str):
     if best_score >= NOTIFY_THRESHOLD:
         db.update_item(lost_i["item_id"],  {"status": "matched"})
         db.update_item(found_i["item_id"], {"status": "matched"})
+        cache.invalidate_items_sync()
 
-    ts = datetime.utcnow().isoformat()
+    ts = datetime.now(timezone.utc).isoformat()
     match_data = {
         "match_id":         str(uuid.uuid4()),
         "lost_item_id":     lost_i["item_id"],
@@ -362,64 +471,147 @@ async def trigger_fast_matching(item_id: str):
 
 # ── Deep AI matching (MobileNetV3 + SentenceTransformers) ────────────────────
 
+AI_BATCH_SIZE   = 32     # flush once this many items are queued …
+AI_BATCH_WINDOW = 0.05   # … or this many seconds after the first arrives
+
+_ai_queue: Optional[asyncio.Queue] = None
+
+
 async def trigger_ai_processing(item_id: str):
-    """
-    Deep AI matching using vision + text embeddings.
-    Images are now Cloudinary URLs — engine.py downloads them on the fly.
-    Falls back gracefully if ML libs are unavailable (Render free tier RAM).
-    """
-    print(f"🤖 Deep AI processing: {item_id}")
+    """Queue an item for deep AI matching; the batch worker picks it up."""
+    if CELERY_ENABLED:
+        # Out of process: embedding_queue workers embed, match_queue workers match
+        # delay() is a blocking broker round-trip (with publish retries)
+        await run_in_threadpool(embed_items.delay, [item_id])
+        return
+    if _ai_queue is None:
+        # No worker (e.g. app used without lifespan) — process inline
+        await run_in_threadpool(_process_ai_batch, [item_id])
+        return
+    _ai_queue.put_nowait(item_id)
+
+
+async def _ai_batch_worker():
+    """Collect item_ids until AI_BATCH_SIZE or AI_BATCH_WINDOW, then run one batch."""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch    = [await _ai_queue.get()]
+        deadline = loop.time() + AI_BATCH_WINDOW
+        while len(batch) < AI_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(_ai_queue.get(), timeout=timeout))
+            except asyncio.TimeoutError:
+                break
+        try:
+            await run_in_threadpool(_process_ai_batch, list(dict.fromkeys(batch)))
+        except Exception as e:
+            print(f"❌ AI batch failed: {e}")
+
+
+def _get_engine():
     try:
         from ai.engine import get_ai_engine
-        engine = get_ai_engine()
+        return get_ai_engine()
     except Exception as e:
         print(f"⚠️  AI engine unavailable ({e}) — keyword matching already ran")
-        return
+        return None
 
-    item = db.get_item(item_id)
-    if not item:
+
+def _process_ai_batch(item_ids: List[str]):
+    """
+    Deep AI matching using vision + text embeddings, for a batch of items.
+    Images are now Cloudinary URLs — engine.py downloads them on the fly.
+    Falls back gracefully if ML libs are unavailable (Render free tier RAM).
+    """
+    print(f"🤖 Deep AI processing: {len(item_ids)} item(s)")
+    engine = _get_engine()
+    if engine is None:
         return
+    items = _extract_and_store_features(engine, item_ids)
+    _match_ai_batch(engine, items)
+
+
+def _extract_and_store_features(engine, item_ids: List[str]) -> List[dict]:
+    """Embed a batch (one model call per modality) and return the items with features."""
+    items = [i for i in (db.get_item(item_id, include_features=True) for item_id in item_ids) if i]
+    if not items:
+        return []
+
+    # Items reusing a known image (same digest) already carry its features
+    with_image     = [i for i in items if i.get("image_path") and i.get("image_features") is None]
+    image_features = _embed_cached(
+        [cache.image_embedding_key(i.get("image_digest")) for i in with_image],
+        [i["image_path"] for i in with_image],
+        engine.extract_image_features_batch,
+    )
+    image_by_id    = {i["item_id"]: f for i, f in zip(with_image, image_features)}
 
-    # ── Extract & store features ──────────────────────────────────────────
-    image_features = None
-    if item.get("image_path"):
-        feats = engine.extract_image_features(item["image_path"])
-        if feats is not None:
-            image_features = feats.tolist()
-
-    text = f"{item.get('title','')} {item.get('description','')}"
-    text_embedding = None
-    emb = engine.extract_text_embedding(text)
-    if emb is not None:
-        text_embedding = emb.tolist()
-
-    if image_features and text_embedding:
-        db.update_item_features(item_id, image_features, text_embedding)
-        item = db.get_item(item_id)  # reload with features
-    else:
-        print("   ⚠️  Feature extraction incomplete — using text only for AI match")
+    texts           = [f"{i.get('title','')} {i.get('description','')}" for i in items]
+    text_embeddings = _embed_cached(
+        [cache.text_embedding_key(t) for t in texts], texts,
+        engine.extract_text_embeddings_batch,
+    )
 
-    # ── Find AI matches ───────────────────────────────────────────────────
-    opposite   = "found" if item["item_type"] == "lost" else "lost"
-    candidates = db.get_all_items(item_type=opposite, status="active", limit=500)
-    candidates = [c for c in candidates if c.get("image_features") and c.get("text_embedding")]
+    for item, text_embedding in zip(items, text_embeddings):
+        image_vec = image_by_id.get(item["item_id"], item.get("image_features"))
+        if image_vec is not None and text_embedding is not None:
+            db.update_item_features(item["item_id"], image_vec, text_embedding)
+            item["image_features"] = image_vec
+            item["text_embedding"] = text_embedding
+        else:
+            print(f"   ⚠️  Feature extraction incomplete for {item['item_id']} — using text only")
+            item["text_embedding"] = text_embedding
+    return items
+
+
+def _embed_cached(keys: List[Optional[str]], inputs: list, compute) -> list:
+    """Redis-cached embeddings; compute() runs once, on the misses only."""
+    results = cache.get_embeddings(keys)
+    misses  = [j for j, vec in enumerate(results) if vec is None]
+    if misses:
+        for j, vec in zip(misses, compute([inputs[j] for j in misses])):
+            results[j] = vec
+        cache.set_embeddings({
+            keys[j]: results[j] for j in misses
+            if keys[j] and results[j] is not None
+        })
+    return results
+
+
+def _match_ai_batch(engine, items: List[dict]):
+    """Find AI matches — one candidate index per opposite type, shared by the batch."""
+    indexes = {}
+    for item in items:
+        opposite = "found" if item["item_type"] == "lost" else "lost"
+        if opposite not in indexes:
+            candidates = db.get_match_candidates(opposite, status="active", limit=500)
+            indexes[opposite] = engine.build_candidate_index(candidates) if candidates else None
+        if indexes[opposite] is None:
+            print("   ℹ️  No candidates with features yet — keyword match already ran")
+            continue
+        _ai_match_item(engine, item, indexes[opposite])
 
-    if not candidates:
-        print("   ℹ️  No candidates with features yet — keyword match already ran")
-        return
 
-    print(f"🔎 Deep AI comparing against {len(candidates)} candidate(s)...")
+def _ai_match_item(engine, item: dict, index: dict):
+    from ai.engine import MATCH_THRESHOLD, NOTIFY_THRESHOLD
+
+    print(f"🔎 Deep AI comparing '{item['title']}' against {len(index['items'])} candidate(s)...")
     matches = engine.batch_match(
-        query_item      = item,
-        candidate_items = candidates,
-        threshold       = 0.60,
-        top_k           = 5,
+        query_item = item,
+        threshold  = MATCH_THRESHOLD,
+        top_k      = 5,
+        index      = index,
     )
 
-    NOTIFY_THRESHOLD = 0.80
+    ts = datetime.now(timezone.utc).isoformat()
 
     for match in matches:
-        matched_item = match["item"]
+        matched_item = db.get_item(match["item"]["item_id"])
+        if not matched_item:
+            continue
         confidence   = match["confidence_score"]
 
         lost_i  = item         if item["item_type"] == "lost"  else matched_item
@@ -427,7 +619,6 @@ async def trigger_ai_processing(item_id: str):
 
         print(f"🔥 AI MATCH: '{lost_i['title']}' ↔ '{found_i['title']}' @ {round(confidence*100)}%")
 
-        ts = datetime.utcnow().isoformat()
         match_data = {
             "match_id":         str(uuid.uuid4()),
             "lost_item_id":     lost_i["item_id"],
@@ -446,6 +637,7 @@ async def trigger_ai_processing(item_id: str):
         if confidence >= NOTIFY_THRESHOLD:
             db.update_item(lost_i["item_id"],  {"status": "matched"})
             db.update_item(found_i["item_id"], {"status": "matched"})
+            cache.invalidate_items_sync()
             if inserted:
                 try:
                     notify_match(lost_i, found_i, confidence)
@@ -462,4 +654,13 @@ if __name__ == "__main__":
     print("🚀 FINDORA v3 — Supabase + Cloudinary + AI Matching")
     print(f"   http://localhost:{PORT}")
     print("=" * 60)
-    uvicorn.run(app, host="0.0.0.0", port=PORT, reload=False)
\ No newline at end of file
+    # Dev entrypoint — production runs gunicorn + UvicornWorker (see render.yaml)
+    RELOAD = os.getenv("UVICORN_RELOAD", "").lower() in ("1", "true", "yes")
+    uvicorn.run(
+        "main:app" if RELOAD else app,
+        host   = "0.0.0.0",
+        port   = PORT,
+        loop   = "auto",   # uvloop / httptools when installed (not on Windows)
+        http   = "auto",
+        reload = RELOAD,
+    )
\ No newline at end of file
@@ -4,7 +4,8 @@ Pydantic Models for Findora
 Data validation and serialization
 """
 
-from pydantic import BaseModel, Field, EmailStr
+import sys
+from pydantic import BaseModel, Field, EmailStr, TypeAdapter, field_validator
 from typing import Optional, List
 from datetime import datetime
 
@@ -28,6 +29,12 @@ class ItemCreate(BaseModel):
     reward_amount: Optional[float] = 0.0
     contact_info: str = Field(..., min_length=5, max_length=100)
 
+    @field_validator('category', 'item_type', mode='before')
+    @classmethod
+    def _canonical_case(cls, v):
+        """Store the canonical lowercase form — validators and DB filters compare exactly"""
+        return normalize_choice(v) if isinstance(v, str) else v
+
 # ==================== RESPONSE MODELS ====================
 
 class UserResponse(BaseModel):
@@ -84,6 +91,12 @@ class HealthResponse(BaseModel):
     timestamp: str
     database: str = "connected"
 
+# ==================== LIST ADAPTERS ====================
+# Built once at import: validate/dump a whole list in one pydantic-core call
+
+ItemListAdapter  = TypeAdapter(List[ItemResponse])
+MatchListAdapter = TypeAdapter(List[MatchResponse])
+
 # ==================== INTERNAL MODELS ====================
 
 class AIFeatures(BaseModel):
@@ -101,25 +114,31 @@ class MatchScore(BaseModel):
 
 # ==================== VALIDATION ====================
 
-VALID_CATEGORIES = [
-    'wallet', 'phone', 'keys', 'bag', 'jewelry', 
+# frozensets of interned strings: O(1) hashed membership per request
+VALID_CATEGORIES = frozenset(map(sys.intern, (
+    'wallet', 'phone', 'keys', 'bag', 'jewelry',
     'documents', 'electronics', 'clothing', 'accessories', 'other'
-]
+)))
+
+VALID_ITEM_TYPES = frozenset(map(sys.intern, ('lost', 'found')))
 
-VALID_ITEM_TYPES = ['lost', 'found']
+VALID_STATUSES = frozenset(map(sys.intern, ('active', 'matched', 'closed')))
 
-VALID_STATUSES = ['active', 'matched', 'closed']
+VALID_MATCH_STATUSES = frozenset(map(sys.intern, ('pending', 'accepted', 'rejected')))
 
-VALID_MATCH_STATUSES = ['pending', 'accepted', 'rejected']
+def normalize_choice(value: str) -> str:
+    """Canonical lowercase form — call once at parse time, before validating.
+    Lower-cases only when needed, so canonical input allocates nothing."""
+    return value if value.islower() else value.lower()
 
 def validate_category(category: str) -> bool:
-    """Validate item category"""
-    return category.lower() in VALID_CATEGORIES
+    """Validate an already-normalized item category"""
+    return category in VALID_CATEGORIES
 
 def validate_item_type(item_type: str) -> bool:
-    """Validate item type"""
-    return item_type.lower() in VALID_ITEM_TYPES
+    """Validate an already-normalized item type"""
+    return item_type in VALID_ITEM_TYPES
 
 def validate_status(status: str) -> bool:
-    """Validate item status"""
-    return status.lower() in VALID_STATUSES
+    """Validate an already-normalized item status"""
+    return status in VALID_STATUSES
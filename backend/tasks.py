@@ -0,0 +1,57 @@
+"""
+Findora Task Queue — optional Celery workers for deep AI matching
+Enabled when CELERY_BROKER_URL is set; otherwise main.py batches in-process.
+
+Workers:
+    celery -A tasks worker -Q embedding_queue --concurrency 1   # GPU machines
+    celery -A tasks worker -Q match_queue                       # CPU machines
+"""
+
+import os
+from typing import List
+
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "")
+CELERY_ENABLED    = bool(CELERY_BROKER_URL)
+
+celery_app  = None
+embed_items = None
+match_items = None
+
+if CELERY_ENABLED:
+    from celery import Celery
+
+    celery_app = Celery("findora", broker=CELERY_BROKER_URL)
+    celery_app.conf.update(
+        task_routes = {
+            "findora.embed_items": {"queue": "embedding_queue"},
+            "findora.match_items": {"queue": "match_queue"},
+        },
+        task_acks_late             = True,   # re-deliver if a worker dies mid-job
+        worker_prefetch_multiplier = 1,      # model jobs are long — don't hoard them
+    )
+
+    @celery_app.task(name="findora.embed_items", autoretry_for=(Exception,),
+                     retry_backoff=True, max_retries=3)
+    def embed_items(item_ids: List[str]):
+        """Extract + store image/text features, then hand off to match_queue."""
+        # Imported lazily: main imports this module for CELERY_ENABLED
+        from main import _get_engine, _extract_and_store_features
+
+        engine = _get_engine()
+        if engine is None:
+            return
+        items = _extract_and_store_features(engine, item_ids)
+        if items:
+            match_items.delay([i["item_id"] for i in items])
+
+    @celery_app.task(name="findora.match_items", autoretry_for=(Exception,),
+                     retry_backoff=True, max_retries=3)
+    def match_items(item_ids: List[str]):
+        """Score items (features already stored) against the opposite pool."""
+        from main import db, _get_engine, _match_ai_batch
+
+        engine = _get_engine()
+        if engine is None:
+            return
+        items = [i for i in (db.get_item(item_id, include_features=True) for item_id in item_ids) if i]
+        _match_ai_batch(engine, items)